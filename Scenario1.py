@@ -1,36 +1,12 @@
-import random
+from tictactoe import best_move
+from tictactoe.bitboard import check_winner_at
+from tictactoe.board import check_draw
 
 def print_board(board):
     for row in board:
         print(" | ".join(row))
         print("-" * 10)
 
-def check_winner(board, mark):
-    for row in board: #check horizontal for 3 in a row
-        if row.count(mark) == 3:
-            return True
-    for col in range(3):
-        if [board[row][col] for row in range(3)].count(mark) == 3: #check vertical for 3 in a row
-            return True
-    if [board[i][i] for i in range(3)].count(mark) == 3 or [board[i][2 - i] for i in range(3)].count(mark) == 3: #check diagonal for 3 in a row
-        return True
-    return False
-
-def check_draw(board):
-    for row in board:
-        for cell in row:
-            if cell not in ['X', 'O']:#allow numbers but not x/o
-                return False
-    return True
-
-def get_empty_positions(board):
-    empty_positions = []
-    for i, row in enumerate(board):
-        for j, cell in enumerate(row):
-            if cell not in ['X', 'O']: #check that cell is not already picked
-                empty_positions.append((i, j))
-    return empty_positions
-
 def player_move(board):
     print("Your turn:")
     while True:
@@ -42,7 +18,7 @@ def player_move(board):
             row, col = divmod(move, 3)
             if board[row][col] not in ['X', 'O']:
                 board[row][col] = 'X'
-                break
+                return row, col
             else:
                 print("Position already taken. Try again.")
         except ValueError:
@@ -50,9 +26,9 @@ def player_move(board):
 
 def computer_move(board): #random placement by computer
     print("Computer's turn:")
-    empty_positions = get_empty_positions(board)
-    move = random.choice(empty_positions)
+    move = best_move(board, 'O', engine="random")
     board[move[0]][move[1]] = 'O'
+    return move
 
 def main():
     board = [[str(3 * i + j + 1) for j in range(3)] for i in range(3)]
@@ -61,9 +37,9 @@ def main():
 
     while True:
         #player's move
-        player_move(board)
+        move = player_move(board)
         print_board(board)
-        if check_winner(board, "X"):
+        if check_winner_at(board, "X", *move):
             print("You win!")
             break
         if check_draw(board):
@@ -71,13 +47,14 @@ def main():
             break
 
         #computer's random move
-        computer_move(board)
+        move = computer_move(board)
         print_board(board)
-        if check_winner(board, "O"):
+        if check_winner_at(board, "O", *move):
             print("Player 2 (Computer) wins!")
             break
         if check_draw(board):
             print("This game is a draw!")
             break
 
-main()
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,12 @@
-import random
+from tictactoe import best_move
+from tictactoe.bitboard import check_winner_at
+from tictactoe.board import check_draw
 
 def print_board(board):
     for row in board:
         print(" | ".join(row))
         print("-" * 10)
 
-def check_winner(board, mark):
-    #checks for 3 in a row on a 3x3 board
-    for row in board:
-        if row.count(mark) == 3: #horizontal win
-            return True
-    for col in range(3):
-        if [board[row][col] for row in range(3)].count(mark) == 3: #vertical win
-            return True
-    if [board[i][i] for i in range(3)].count(mark) == 3 or [board[i][2 - i] for i in range(3)].count(mark) == 3: #diagonal win
-        return True
-    return False
-
-def check_draw(board):
-    #checks if there are any empty cells left on the board, if not then the game is a draw
-    for row in board:
-        for cell in row:
-            if cell not in ['X', 'O']:
-                return False
-    return True
-
-def get_empty_positions(board):
-    #returns a list of empty positions ( not filled with x or o ), marked by co-ordinates
-    empty_positions = []
-    for i, row in enumerate(board):
-        for j, cell in enumerate(row):
-            if cell not in ['X', 'O']:
-                empty_positions.append((i, j))
-    return empty_positions
-
 def player_move(board, player_marker):
     print("Your turn:")
     while True:
@@ -45,48 +18,17 @@ def player_move(board, player_marker):
             row, col = divmod(move, 3)
             if board[row][col] not in ['X', 'O']:
                 board[row][col] = player_marker
-                break
+                return row, col
             else:
                 print("There is already a marker in this position, try again.")
         except ValueError:
             print("Invalid input. Enter a number between 1 and 9.")
 
-def can_win(board, mark):
-    for i in range(3):
-        for j in range(3):
-            if board[i][j] not in ['X', 'O']:
-                board[i][j] = mark
-                if check_winner(board, mark):
-                    board[i][j] = str(3 * i + j + 1)  # reset ce;;
-                    return (i, j)
-                board[i][j] = str(3 * i + j + 1)#reset cell
-    return None
-
-def computer_move(board, computer_marker):
+def computer_move(board, computer_marker): #win, block, fork, block fork, centre, then random
     print("Computer's turn:")
-
-    # Step 1: Check if there is a move to win the game
-    move = can_win(board, computer_marker)
-    if move:
-        board[move[0]][move[1]] = computer_marker
-        return
-
-    # Step 2: Check for a move to block the opponent's game
-    opponent_marker = 'X' if computer_marker == 'O' else 'O'
-    move = can_win(board, opponent_marker)
-    if move:
-        board[move[0]][move[1]] = computer_marker
-        return
-
-    # Step 3: Claim the center if unoccupied
-    if board[1][1] not in ['X', 'O']:
-        board[1][1] = computer_marker
-        return
-
-    # Step 4: Place the marker on any empty cell
-    empty_positions = get_empty_positions(board)
-    move = random.choice(empty_positions)
+    move = best_move(board, computer_marker, engine="rules")
     board[move[0]][move[1]] = computer_marker
+    return move
 
 def main():
     board = [[str(3 * i + j + 1) for j in range(3)] for i in range(3)]
@@ -108,16 +50,16 @@ def main():
     while True:
         if player_turn:
             # Player move
-            player_move(board, player_marker)
+            move = player_move(board, player_marker)
             print_board(board)
-            if check_winner(board, player_marker):
+            if check_winner_at(board, player_marker, *move):
                 print("You win!")
                 break
         else:
             # Computer move
-            computer_move(board, computer_marker)
+            move = computer_move(board, computer_marker)
             print_board(board)
-            if check_winner(board, computer_marker):
+            if check_winner_at(board, computer_marker, *move):
                 print("Player 2 (Computer) wins!")
                 break
         
@@ -127,4 +69,5 @@ def main():
 
         player_turn = not player_turn
 
-main()
+if __name__ == "__main__":
+    main()
@@ -1,135 +1,36 @@
+from tictactoe import gametree
+from tictactoe.bitboard import check_winner_at
+from tictactoe.board import check_draw
+from tictactoe.stats import SearchStats
+
+TREE_DEPTH = None #levels of the game tree to print, None prints all of it
+STATS_FILE = None #a path to write the search statistics to as JSON after every computer move
+
 def print_board(board):
     for row in board:
         print(" | ".join(row))
         print("-" * 10)
 
-def check_winner(board, mark):
-    #checks for 3 in a row on a 3x3 board
-    for row in board:
-        if row.count(mark) == 3: #horizontal win
-            return True
-    for col in range(3):
-        if [board[row][col] for row in range(3)].count(mark) == 3: #vertical win
-            return True
-    if [board[i][i] for i in range(3)].count(mark) == 3 or [board[i][2 - i] for i in range(3)].count(mark) == 3: #diagonal win
-        return True
-    return False
-
-def check_draw(board):
-    #checks if there are any empty cells left on the board, if not then the game is a draw
-    for row in board:
-        for cell in row:
-            if cell not in ['X', 'O']:
-                return False
-    return True
-
-def get_empty_positions(board):
-    #returns a list of empty positions ( not filled with x or o ), marked by co-ordinates
-    empty_positions = []
-    for i, row in enumerate(board):
-        for j, cell in enumerate(row):
-            if cell not in ['X', 'O']:
-                empty_positions.append((i, j))
-    return empty_positions
-
-def score(board, player, opponent): #keep a score, which is important for a minimax algorithm
-    if check_winner(board, player):
-        return 10
-    elif check_winner(board, opponent):
-        return -10
-    else:
-        return 0
-    
-def minimax(board, depth, is_maximizing, player, opponent, game_tree):
-    #evaluate the current board state
-    #print(f"Minimax call: depth={depth}, is_maximizing={is_maximizing}") #some testing 
-    board_score = score(board, player, opponent)
-    
-    
-    #check if the game is won or lost and return the score
-    if board_score == 10 or board_score == -10:
-        game_tree["score"] = board_score #sets score for tree
-        game_tree["children"] = {} #reset children key
-        return board_score
-    
-    #return 0 if draw
-    if check_draw(board):
-        game_tree["score"] = 0
-        game_tree["children"] = {}
-        return 0
-
-    # if maximizing is true ( computer's turn )
-    if is_maximizing:
-        # initialise best to negative infinity to ensure any valid move will be higher
-        best = -float('inf')
-        game_tree["children"] = {}
-        
-        #iterate over all empty positions
-        for move in get_empty_positions(board):
-            #simluates move by placing computer's marker
-            board[move[0]][move[1]] = player
-            
-            # recursively calls minimax for the next move with the minimizing
-            child_tree = {} #resets child tree
-            game_tree["children"][f"Move {move}"] = child_tree #adds a new child node for the current move
-            best = max(best, minimax(board, depth + 1, False, player, opponent, child_tree))
-            
-            #resets position
-            board[move[0]][move[1]] = str(3 * move[0] + move[1] + 1)
-        
-        # returns best score
-        game_tree["score"] = best
-        return best
-    else:
-        # for the human player's turn (minimizer), initialise best to positive infinity
-        best = float('inf')
-        game_tree["children"] = {}
-        
-        for move in get_empty_positions(board):
-            board[move[0]][move[1]] = opponent
-            
-            # recursively calls minimax for the next move with the minimizing - taking the minimum move (where the opponent does not win)
-            child_tree = {}
-            game_tree["children"][f"Move {move}"] = child_tree
-            best = min(best, minimax(board, depth + 1, True, player, opponent, child_tree))
-       
-            board[move[0]][move[1]] = str(3 * move[0] + move[1] + 1)
-        
-        game_tree["score"] = best
-        return best
-    
-def print_game_tree(game_tree, depth=0):
-    indent = " " * (depth * 2)
-    for move, subtree in game_tree["children"].items():
-        print(f"{indent}{move}: {subtree['score']}")
-        print_game_tree(subtree, depth + 1) #indents further for each depth in that bracnh for readability
+def print_game_tree(game_tree, max_depth=TREE_DEPTH):
+    #lines are printed as the tree is searched and nothing is kept, so even the whole tree needs little memory
+    for _, _, depth, cell, score in game_tree.stream(max_depth):
+        if depth:
+            indent = " " * ((depth - 1) * 2) #indents further for each depth in that bracnh for readability
+            print(f"{indent}Move {divmod(cell, 3)}: {score}")
 
-def computer_move(board, computer_marker, print_tree=False):
+def computer_move(board, computer_marker, print_tree=False): #full minimax that keeps its tree, see tictactoe/gametree.py
     print("Computer's turn:")
-    opponent_marker = 'X' if computer_marker == 'O' else 'O'
-    best_val = -float('inf')
-    best_move = None
-    game_tree = {"children": {}}
-
-    for move in get_empty_positions(board):
-        board[move[0]][move[1]] = computer_marker  # places computer marker to simulate the move
-        move_tree = {}
-        move_val = minimax(board, 0, False, computer_marker, opponent_marker, move_tree) # evaluate with minimax
-        game_tree["children"][f"Move {move}"] = move_tree
-        board[move[0]][move[1]] = str(3 * move[0] + move[1] + 1)  # undo temp move
-
-        if move_val > best_val:
-            best_move = move
-            best_val = move_val
+    (row, col), game_tree = gametree.best_move(board, computer_marker)
 
     # make the best move
-    if best_move:
-        board[best_move[0]][best_move[1]] = computer_marker
+    board[row][col] = computer_marker
     
     if print_tree:
         print("Game Tree:")
         print_game_tree(game_tree)
 
+    return row, col
+
 
 def player_move(board, player_marker):
     print("Your turn:")
@@ -142,7 +43,7 @@ def player_move(board, player_marker):
             row, col = divmod(move, 3)
             if board[row][col] not in ['X', 'O']:
                 board[row][col] = player_marker
-                break
+                return row, col
             else:
                 print("There is already a marker in this position, try again.")
         except ValueError:
@@ -169,20 +70,26 @@ def main():
 
     player_turn = True if first_move == 'yes' else False
     print_tree_option = True if print_tree == 'yes' else False
+    stats = None
+    if STATS_FILE:
+        stats = SearchStats()
+        stats.attach()
 
     while True:
         if player_turn:
             # Player move
-            player_move(board, player_marker)
+            move = player_move(board, player_marker)
             print_board(board)
-            if check_winner(board, player_marker):
+            if check_winner_at(board, player_marker, *move):
                 print("You win!")
                 break
         else:
             # Computer move with tree printing
-            computer_move(board, computer_marker, print_tree_option)
+            move = computer_move(board, computer_marker, print_tree_option)
+            if stats is not None:
+                stats.write(STATS_FILE)
             print_board(board)
-            if check_winner(board, computer_marker):
+            if check_winner_at(board, computer_marker, *move):
                 print("Player 2 (Computer) wins!")
                 break
         
@@ -192,6 +99,7 @@ def main():
 
         player_turn = not player_turn #swaps turn
 
-main()
+if __name__ == "__main__":
+    main()
 
 #https://www.javatpoint.com/mini-max-algorithm-in-ai https://www.neverstopbuilding.com/blog/minimax
\ No newline at end of file
@@ -1,4 +1,23 @@
-MAX_DEPTH = 4  #sets max depth for faster calculations with slightly less accuracy
+import sys
+
+from tictactoe import get_engine, get_mcts
+from tictactoe.bitboard import LineCountBoard, check_winner_at
+from tictactoe.board import check_draw
+from tictactoe.ponder import Ponderer
+from tictactoe.stats import SearchStats
+
+MOVE_TIME = 1.0  #seconds the computer may think per move, the search goes as deep as this allows
+MAX_DEPTH = None  #optional cap on the iterative deepening, None keeps deepening until the budget runs out
+TT_SIZE_MB = 64  #memory cap for each transposition table
+WORKERS = None  #set to a number of processes to search the root moves in parallel
+ENGINE = "alphabeta"  #or "mcts" for the Monte Carlo tree search, which plays better at short move times
+PONDER = False  #alphabeta only: search the likely replies while you think, so the answer to them is instant
+STATS_FILE = None  #alphabeta only: a path to write the search statistics to as JSON after every computer move
+
+#5x5 with 5 in a row by default, run as "python Scenario4.py WIDTH HEIGHT K" for other boards (e.g. 15 15 5 for gomoku)
+WIDTH = 5
+HEIGHT = 5
+K = 5
 
 class color: #makes the moves more readable
    PURPLE = '\033[95m'
@@ -13,201 +32,68 @@ class color: #makes the moves more readable
    END = '\033[0m'
 
 def print_board(board):
+    width = max(2, len(str(len(board) * len(board[0])))) #every cell is as wide as the biggest label
     for row in board:
         formatted_row = []
         for cell in row:
             if cell == 'X':
-                formatted_row.append(f"{color.BOLD}{color.RED}{cell:2}{color.END}")
+                formatted_row.append(f"{color.BOLD}{color.RED}{cell:{width}}{color.END}")
             elif cell == 'O':
-                formatted_row.append(f"{color.BOLD}{color.CYAN}{cell:2}{color.END}")
+                formatted_row.append(f"{color.BOLD}{color.CYAN}{cell:{width}}{color.END}")
             else:
-                formatted_row.append(f"{cell:2}")
+                formatted_row.append(f"{cell:{width}}")
         print(" | ".join(formatted_row))  # Ensures all the cells have a minimum of 2 characters width
-        print("-" * 24)
-
-def check_winner(board, mark):
-    #checks for 5 in a row on a 5x5 board
-    for row in board:
-        if row.count(mark) == 5: #horizontal win
-            return True
-    for col in range(5):
-        if [board[row][col] for row in range(5)].count(mark) == 5: #vertical win
-            return True
-    if [board[i][i] for i in range(5)].count(mark) == 5 or [board[i][4 - i] for i in range(5)].count(mark) == 5: #diagonal win
-        return True
-    return False
-
-def check_draw(board):
-    #checks if there are any empty cells left on the board, if not then the game is a draw
-    for row in board:
-        for cell in row:
-            if cell not in ['X', 'O']:
-                return False
-    return True
-
-def get_empty_positions(board):
-    #returns a list of empty positions ( not filled with x or o ), marked by co-ordinates
-    empty_positions = []
-    for i, row in enumerate(board):
-        for j, cell in enumerate(row):
-            if cell not in ['X', 'O']:
-                empty_positions.append((i, j))
-    return empty_positions
-
-def score(board, player, opponent): #keep a score, which is important for a minimax algorithm
-    if check_winner(board, player):
-        return 10
-    elif check_winner(board, opponent):
-        return -10
-    else:
-        return 0
-    
-def heuristic_evaluation(board, player, opponent):
-    player_score = 0
-    opponent_score = 0
-
-    #evals row
-    for row in board:
-        player_score += row.count(player)
-        opponent_score += row.count(opponent)
-
-    #evals column
-    for col in range(5):
-        player_score += [board[row][col] for row in range(5)].count(player)
-        opponent_score += [board[row][col] for row in range(5)].count(opponent)
-
-    #evals diagnoal
-    player_score += [board[i][i] for i in range(5)].count(player)
-    player_score += [board[i][4 - i] for i in range(5)].count(player)
-    opponent_score += [board[i][i] for i in range(5)].count(opponent)
-    opponent_score += [board[i][4 - i] for i in range(5)].count(opponent)
-
-    return player_score - opponent_score
-    
-"""PSUEDOCODE
-function minimax(node, depth, isMaximizingPlayer, alpha, beta):
-
-    if node is a leaf node :
-        return value of the node
-    
-    if isMaximizingPlayer :
-        bestVal = -INFINITY 
-        for each child node :
-            value = minimax(node, depth+1, false, alpha, beta)
-            bestVal = max( bestVal, value) 
-            alpha = max( alpha, bestVal)
-            if beta <= alpha:
-                break
-        return bestVal
-
-    else :
-        bestVal = +INFINITY 
-        for each child node :
-            value = minimax(node, depth+1, true, alpha, beta)
-            bestVal = min( bestVal, value) 
-            beta = min( beta, bestVal)
-            if beta <= alpha:
-                break
-        return bestVal"""
-
-def minimax(board, depth, is_maximizing, player, opponent, alpha, beta):
-    # Debug statement to track progress
-    # print(f"Minimax call: depth={depth}, is_maximizing={is_maximizing}, alpha={alpha}, beta={beta}")
-
-    #evaluate the current board state
-    board_score = score(board, player, opponent)
-    
-    #check if the game is won or lost and return the score
-    if board_score == 10 or board_score == -10:
-        return board_score
-    
-    #return 0 if draw
-    if check_draw(board):
-        return 0
-    
-    if depth >= MAX_DEPTH:
-        return heuristic_evaluation(board, player, opponent)
-
-    # if maximizing is true ( computer's turn )
-    if is_maximizing:
-        # initialise best to negative infinity to ensure any valid move will be higher
-        best = -float('inf')
-        
-        #iterate over all empty positions
-        for move in get_empty_positions(board):
-            #simluates move by placing computer's marker
-            board[move[0]][move[1]] = player
-            
-            # recursively calls minimax for the next move with the minimizing
-            best = max(best, minimax(board, depth + 1, False, player, opponent, alpha, beta))
-            
-            #resets position
-            board[move[0]][move[1]] = str(5 * move[0] + move[1] + 1)
-
-            alpha = max(alpha, best)
-
-            if beta <= alpha:
-                break
-        
-        # returns best score
-        return best
-    else:
-        # for the human player's turn (minimizer), initialise best to positive infinity
-        best = float('inf')
-        
-        for move in get_empty_positions(board):
-            board[move[0]][move[1]] = opponent
-            
-            # recursively calls minimax for the next move with the minimizing - taking the minimum move (where the opponent does not win)
-            best = min(best, minimax(board, depth + 1, True, player, opponent, -float('inf'), float('inf')))
-       
-            board[move[0]][move[1]] = str(5 * move[0] + move[1] + 1)
-            beta = min(beta, best)
-            if beta <= alpha:
-                break
-        
-        return best
-
+        print("-" * ((width + 3) * len(row) - 1))
 
 def player_move(board, player_marker):
     print("Your turn:")
+    cells = len(board) * len(board[0])
     while True:
         try:
-            move = int(input("Enter the position (1-25): ")) - 1
-            if move < 0 or move >= 25:
-                print("This is out of bounds of this board, please choose between 1 and 25.")
+            move = int(input(f"Enter the position (1-{cells}): ")) - 1
+            if move < 0 or move >= cells:
+                print(f"This is out of bounds of this board, please choose between 1 and {cells}.")
                 continue
-            row, col = divmod(move, 5)
+            row, col = divmod(move, len(board[0]))
             if board[row][col] not in ['X', 'O']:
                 board[row][col] = player_marker
-                break
+                return row, col
             else:
                 print("There is already a marker in this position, try again.")
         except ValueError:
-            print("Invalid input. Enter a number between 1 and 9.")
+            print(f"Invalid input. Enter a number between 1 and {cells}.")
 
-def computer_move(board, computer_marker):
+def computer_move(board, computer_marker, time_budget=MOVE_TIME, node_budget=None, k=K, pondered=None):
+    #searches within the time or node budget (playouts for mcts), returns the (row, col) played
+    #pondered is (cell, depth) from pondering the player's move, which is played without searching again
+    #alphabeta plays the first moves straight from the opening book once it is built (python -m tictactoe.book),
+    #unless MAX_DEPTH is set
     print("Computer's turn:")
-    opponent_marker = 'X' if computer_marker == 'O' else 'O'
-    best_val = -float('inf')  
-    best_move = None 
-
-    # Iterate over all empty positions on the board.
-    for move in get_empty_positions(board):
-        board[move[0]][move[1]] = computer_marker  # simulate move by placing computer marker
-        move_val = minimax(board, 0, False, computer_marker, opponent_marker, -float('inf'), float('inf'))  # evaluate with minimax
-        board[move[0]][move[1]] = str(5 * move[0] + move[1] + 1)  #undo move
-
-        if move_val > best_val:
-            best_move = move  
-            best_val = move_val  
+    bitboard = LineCountBoard.from_board(board, k)
+    #the same engine is used for every move, so its table, killers and history (or its tree) carry over
+    if pondered is not None:
+        best_move, depth_reached = pondered
+    elif ENGINE == "mcts":
+        engine = get_mcts(bitboard.width, bitboard.height, bitboard.k)
+        best_move, playouts = engine.best_move(bitboard, computer_marker, time_budget, node_budget)
+    else:
+        engine = get_engine(bitboard.width, bitboard.height, bitboard.k, TT_SIZE_MB, MAX_DEPTH, WORKERS)
+        best_move, depth_reached = engine.best_move(bitboard, computer_marker, time_budget, node_budget)
 
     # make the best move found
-    if best_move:
-        board[best_move[0]][best_move[1]] = computer_marker
+    row, col = divmod(best_move, bitboard.width)
+    board[row][col] = computer_marker
+    if pondered is not None:
+        print(f"Pondered to depth {depth_reached}")
+    elif ENGINE == "mcts":
+        print(f"Played out {playouts} games")
+    else:
+        print(f"Searched to depth {depth_reached}")
+    return row, col
 
 def main():
-    board = [[str(5 * i + j + 1) for j in range(5)] for i in range(5)]
+    width, height, k = (int(arg) for arg in sys.argv[1:4]) if len(sys.argv) > 3 else (WIDTH, HEIGHT, K)
+    board = [[str(width * i + j + 1) for j in range(width)] for i in range(height)]
     print("Initial board:")
     print_board(board)
 
@@ -222,20 +108,34 @@ def main():
         first_move = input("Be serious, do you want to go first? (yes/no): ").lower()#provides the choice to go first or second
 
     player_turn = True if first_move == 'yes' else False
+    ponderer = None
+    if PONDER and ENGINE == "alphabeta":
+        ponderer = Ponderer(get_engine(width, height, k, TT_SIZE_MB, MAX_DEPTH, WORKERS))
+    pondered = None
+    stats = None
+    if STATS_FILE and ENGINE == "alphabeta":
+        stats = SearchStats() #counts every search of the game so far, pondering included
+        stats.attach(get_engine(width, height, k, TT_SIZE_MB, MAX_DEPTH, WORKERS))
 
     while True:
         if player_turn:
-            # Player move
-            player_move(board, player_marker)
+            # Player move, the computer ponders its answers while it waits
+            if ponderer is not None:
+                ponderer.start(LineCountBoard.from_board(board, k), player_marker, computer_marker, MOVE_TIME)
+            move = player_move(board, player_marker)
+            if ponderer is not None:
+                pondered = ponderer.stop(width * move[0] + move[1], MOVE_TIME)
             print_board(board)
-            if check_winner(board, player_marker):
+            if check_winner_at(board, player_marker, *move, k):
                 print("You win!")
                 break
         else:
             # Computer move
-            computer_move(board, computer_marker)
+            move = computer_move(board, computer_marker, k=k, pondered=pondered)
+            if stats is not None:
+                stats.write(STATS_FILE)
             print_board(board)
-            if check_winner(board, computer_marker):
+            if check_winner_at(board, computer_marker, *move, k):
                 print("Player 2 (Computer) wins!")
                 break
         
@@ -245,7 +145,8 @@ def main():
 
         player_turn = not player_turn #swaps turn
 
-main()
+if __name__ == "__main__":
+    main()
 
 
 #https://www.geeksforgeeks.org/minimax-algorithm-in-game-theory-set-4-alpha-beta-pruning/ 
@@ -0,0 +1,257 @@
+#reproducible benchmarks of the board primitives and of every engine's move, saved as JSON and compared between runs
+#micro: time per call of check_winner, get_empty_positions, score and can_win on 3x3 and 5x5 boards
+#macro: one computer move from fixed opening, midgame and endgame positions, timed from a cold start (fresh engine,
+#empty caches) with alphabeta on a node budget and mcts on a playout budget so every run does the same work.
+#Nodes come from a separate run with stats.SearchStats attached, peak memory from another run under tracemalloc
+#times depend on how busy the machine is, so compare runs made on the same quiet machine. Node counts are exact,
+#a change in them means the search itself changed
+#run with: python benchmark.py [--out FILE] [--repeat N] [--only micro|macro]
+#     or:  python benchmark.py --compare OLD.json NEW.json [--threshold 0.1]      (exits 1 if anything regressed)
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import timeit
+import tracemalloc
+
+from tictactoe import best_move, gametree, minimax3
+from tictactoe.bitboard import LineCountBoard
+from tictactoe.board import check_winner, get_empty_positions
+from tictactoe.engine import Engine, score
+from tictactoe.mcts import MCTS
+from tictactoe.rules import can_win
+from tictactoe.stats import SearchStats
+
+REPEAT = 5 #timed runs of each benchmark, the fastest is kept as the one least disturbed by the rest of the machine
+THRESHOLD = 0.10 #compare flags a metric that got this much worse
+MIN_SECONDS = 0.001 #moves quicker than this are too noisy to compare their times
+MIN_TOTAL = 0.5 #quick moves are repeated until their runs add up to this many seconds
+ALPHABETA_NODES = 20000
+MCTS_PLAYOUTS = 1000
+
+POSITIONS = { #name -> (rows with '.' for empty, k), the marker to move is X when the counts are equal
+    "3x3_opening": (["..."] * 3, 3),
+    "3x3_midgame": (["X..", ".O.", "..X"], 3),
+    "3x3_endgame": (["XOX", "OX.", "..O"], 3),
+    "5x5_opening": (["....."] * 5, 5),
+    "5x5_midgame": (["O....", ".X...", "..X..", "...X.", "....O"], 5),
+    "5x5_endgame": (["XXOOX", "OOXXO", "XXOOX", "OO...", ".X..."], 5),
+}
+
+METRICS = { #metric -> True when bigger is better
+    "ns_per_call": False,
+    "seconds": False,
+    "nodes_per_second": True,
+    "peak_kb": False,
+}
+
+
+def board_of(rows):
+    #list of lists board labelled like the game loops label it
+    width = len(rows[0])
+    return [[cell if cell in "XO" else str(width * i + j + 1) for j, cell in enumerate(row)] for i, row in enumerate(rows)]
+
+
+def to_move(rows):
+    x = sum(row.count('X') for row in rows)
+    o = sum(row.count('O') for row in rows)
+    return 'X' if x == o else 'O'
+
+
+#micro benchmarks: name -> function of (board, mark, k) returning the call to time
+
+def bench_check_winner(board, mark, k):
+    return lambda: check_winner(board, mark, k)
+
+
+def bench_get_empty_positions(board, mark, k):
+    return lambda: get_empty_positions(board)
+
+
+def bench_score(board, mark, k):
+    bitboard = LineCountBoard.from_board(board, k)
+    other = 'O' if mark == 'X' else 'X'
+    return lambda: score(bitboard, mark, other)
+
+
+def bench_can_win(board, mark, k):
+    return lambda: can_win(board, mark)
+
+
+MICRO = {"check_winner": bench_check_winner, "get_empty_positions": bench_get_empty_positions,
+         "score": bench_score, "can_win": bench_can_win}
+
+
+#macro benchmarks: name -> function of (board, mark, k, stats) that plays one move from a cold start
+#and returns the nodes (playouts for mcts) searched, counted with stats when it is given, None when unknown
+
+def move_random(board, mark, k, stats):
+    best_move(board, mark, "random", rng=random.Random(0))
+
+
+def move_rules(board, mark, k, stats):
+    best_move(board, mark, "rules", rng=random.Random(0))
+
+
+def move_minimax(board, mark, k, stats):
+    #Scenario3_noTree, the solved table answers when it has been built
+    minimax3.memo.clear()
+    return search_3x3(lambda: best_move(board, mark, "minimax"), stats)
+
+
+def move_gametree(board, mark, k, stats):
+    #Scenario3
+    minimax3.memo.clear()
+    gametree.values.clear()
+    gametree.last_tree = None
+    return search_3x3(lambda: gametree.best_move(board, mark), stats)
+
+
+def search_3x3(move, stats):
+    if stats is None:
+        move()
+        return None
+    stats.attach()
+    try:
+        move()
+    finally:
+        stats.detach()
+    return sum(stats.nodes.values())
+
+
+def move_alphabeta(board, mark, k, stats):
+    #Scenario4
+    bitboard = LineCountBoard.from_board(board, k)
+    engine = Engine(bitboard.width, bitboard.height, bitboard.k)
+    engine.book = engine.endgame = None #the search is what is measured, whether or not the tables have been built
+    if stats is None:
+        engine.best_move(bitboard, mark, node_budget=ALPHABETA_NODES)
+        return None
+    stats.attach(engine)
+    try:
+        engine.best_move(bitboard, mark, node_budget=ALPHABETA_NODES)
+    finally:
+        stats.detach()
+    return sum(stats.nodes.values())
+
+
+def move_mcts(board, mark, k, stats):
+    bitboard = LineCountBoard.from_board(board, k)
+    _, playouts = MCTS(bitboard.width, bitboard.height, bitboard.k, seed=0).best_move(bitboard, mark, playout_budget=MCTS_PLAYOUTS)
+    return playouts
+
+
+MACRO = {"random": move_random, "rules": move_rules, "minimax": move_minimax, "gametree": move_gametree,
+         "alphabeta": move_alphabeta, "mcts": move_mcts}
+ONLY_3X3 = ("minimax", "gametree")
+
+
+def run_micro(repeat):
+    results = {}
+    for position, (rows, k) in POSITIONS.items():
+        board, mark = board_of(rows), to_move(rows)
+        for name, bench in MICRO.items():
+            call = bench(board, mark, k)
+            timer = timeit.Timer(call)
+            number, _ = timer.autorange() #enough calls to take at least 0.2 seconds
+            best = min(timer.repeat(repeat, number)) / number
+            results[f"micro/{name}/{position}"] = {"ns_per_call": best * 1e9}
+    return results
+
+
+def run_macro(repeat):
+    results = {}
+    for position, (rows, k) in POSITIONS.items():
+        board, mark = board_of(rows), to_move(rows)
+        for name, move in MACRO.items():
+            if name in ONLY_3X3 and len(rows) != 3:
+                continue
+            nodes = move(board, mark, k, SearchStats())
+            times = []
+            gc.disable() #as timeit does, so a collection does not land in one run and not another
+            try:
+                while len(times) < repeat or sum(times) < MIN_TOTAL:
+                    start = time.perf_counter()
+                    move(board, mark, k, None)
+                    times.append(time.perf_counter() - start)
+            finally:
+                gc.enable()
+            tracemalloc.start()
+            move(board, mark, k, None)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            seconds = min(times)
+            results[f"macro/{name}/{position}"] = {
+                "seconds": seconds,
+                "nodes": nodes,
+                "nodes_per_second": nodes / seconds if nodes and seconds else None,
+                "peak_kb": peak / 1024,
+            }
+    return results
+
+
+def compare(old, new, threshold):
+    #prints every benchmark in both runs, returns the names of the ones that got more than threshold worse
+    regressions = []
+    for name in sorted(set(old["results"]) & set(new["results"])):
+        before, after = old["results"][name], new["results"][name]
+        notes = []
+        for metric, bigger_is_better in METRICS.items():
+            if before.get(metric) is None or after.get(metric) is None or not before[metric]:
+                continue
+            if metric in ("seconds", "nodes_per_second") and before["seconds"] < MIN_SECONDS:
+                continue
+            change = after[metric] / before[metric] - 1
+            worse = -change if bigger_is_better else change
+            if worse > threshold:
+                notes.append(f"{metric} {change:+.1%} REGRESSION")
+                regressions.append(name)
+            elif worse < -threshold:
+                notes.append(f"{metric} {change:+.1%} better")
+        if before.get("nodes") != after.get("nodes"):
+            notes.append(f"nodes {before.get('nodes')} -> {after.get('nodes')}") #the search itself changed
+        print(f"{name:40} {', '.join(notes) or 'unchanged'}")
+    for name in sorted(set(old["results"]) ^ set(new["results"])):
+        print(f"{name:40} only in {'the old' if name in old['results'] else 'the new'} run")
+    return sorted(set(regressions))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark the board primitives and the engines")
+    parser.add_argument("--out", help="JSON file for the results, standard output if not given")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--only", choices=["micro", "macro"])
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two results files instead of running")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="share a metric may get worse by before it is flagged")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            old = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        regressions = compare(old, new, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+        return
+
+    results = {}
+    if args.only != "macro":
+        results.update(run_micro(args.repeat))
+    if args.only != "micro":
+        results.update(run_macro(args.repeat))
+    report = {"python": platform.python_version(), "machine": platform.machine(), "repeat": args.repeat, "results": results}
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
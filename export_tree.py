@@ -0,0 +1,40 @@
+#streams Scenario3's game tree for a position to a file or pipe, see tictactoe/treeexport.py for the formats
+#the position is 9 characters, row by row, X, O or anything else for empty, e.g. "X...O...."
+#run with: python export_tree.py [position] [computer's marker] [--format jsonl|binary] [--depth N] [--pv] [--top K] [--out FILE]
+import argparse
+import sys
+
+from tictactoe.treeexport import FORMATS, export
+
+
+def main():
+    parser = argparse.ArgumentParser(description="stream the game tree for a 3x3 position")
+    parser.add_argument("position", nargs="?", default=".........")
+    parser.add_argument("marker", nargs="?", choices=["X", "O"], help="the computer's marker, by default whoever is to move with X first")
+    parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    parser.add_argument("--depth", type=int, help="levels below the position to export")
+    parser.add_argument("--pv", action="store_true", help="only the principal variation")
+    parser.add_argument("--top", type=int, help="only the best K children of each node")
+    parser.add_argument("--out", help="file to write, standard output if not given")
+    args = parser.parse_args()
+
+    if len(args.position) != 9:
+        parser.error("the position must be 9 characters")
+    board = [[cell if cell in "XO" else str(3 * i + j + 1) for j, cell in enumerate(args.position[3 * i:3 * i + 3])] for i in range(3)]
+    marker = args.marker or ('X' if args.position.count('X') == args.position.count('O') else 'O')
+
+    mode = "w" if args.format == "jsonl" else "wb"
+    out = open(args.out, mode) if args.out else (sys.stdout if mode == "w" else sys.stdout.buffer)
+    try:
+        count = export(out, board, marker, args.format, args.depth, args.pv, args.top)
+    except BrokenPipeError: #the reader stopped early, e.g. piped into head
+        sys.stderr.close()
+        return
+    finally:
+        if args.out:
+            out.close()
+    print(f"{count} nodes", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
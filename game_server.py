@@ -0,0 +1,25 @@
+#runs the tictactoe game server until interrupted, see tictactoe/server.py for the protocol
+#run with: python game_server.py [port] [workers]
+import asyncio
+import sys
+
+from tictactoe.server import GameServer
+
+
+async def main(port, workers):
+    server = GameServer(workers)
+    port = await server.start(port=port)
+    print(f"Listening on 127.0.0.1:{port}", flush=True)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 0
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    try:
+        asyncio.run(main(port, workers))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,48 @@
+#scaling benchmark for the parallel root search
+#searches fixed 5x5 positions to a fixed depth with 1, 2, 4, 8 and 16 workers, checks every run plays
+#the same move as the serial search and prints the time and speedup of each
+#run with: python parallel_scaling.py [depth]
+import sys
+import time
+
+from tictactoe.engine import Engine
+
+WORKER_COUNTS = [1, 2, 4, 8, 16]
+DEPTH = 4
+
+POSITIONS = [ #(cells taken by X, cells taken by O, marker to move)
+    ([12], [], 'O'),
+    ([12, 6], [0], 'O'),
+    ([12, 6, 18], [0, 24], 'O'),
+]
+
+
+def run(workers, depth):
+    #fresh engines every time so no run benefits from an earlier one's table
+    moves = []
+    start = time.perf_counter()
+    for x_cells, o_cells, mover in POSITIONS:
+        engine = Engine(5, max_depth=depth, workers=workers)
+        engine.book = None #the opening positions would come straight from the book, not the parallel search
+        board = engine.new_board(sum(1 << c for c in x_cells), sum(1 << c for c in o_cells))
+        moves.append(engine.best_move(board, mover)[0])
+        engine.close()
+    return moves, time.perf_counter() - start
+
+
+def main():
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else DEPTH
+    serial_moves, serial_time = run(None, depth)
+    print(f"serial: {serial_time:.2f}s moves {serial_moves}")
+    failed = False
+    for workers in WORKER_COUNTS:
+        moves, elapsed = run(workers, depth)
+        same = moves == serial_moves
+        failed = failed or not same
+        print(f"{workers:2} workers: {elapsed:.2f}s speedup {serial_time / elapsed:.2f}x "
+              f"{'same moves' if same else f'DIFFERENT moves {moves}'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+#random playout speed, numpy batches against one game at a time in pure Python
+#prints playouts per second and the X win/draw/O win rates of each, which should agree
+#run with: python playout_speed.py [playouts]            (needs numpy)
+import random
+import sys
+import time
+
+import numpy as np
+
+from tictactoe.batch import new_boards, playouts
+from tictactoe.selfplay import play_game, random_bot
+
+PLAYOUTS = 1000000
+SHAPES = [(3, 3, 3), (4, 4, 3), (5, 5, 4), (5, 5, 5)]
+PYTHON_PLAYOUTS = 20000 #the pure Python loop is only sampled
+
+
+def rates(winners):
+    n = len(winners)
+    return f"X {winners.count(1) / n:6.1%} draw {winners.count(0) / n:6.1%} O {winners.count(-1) / n:6.1%}"
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else PLAYOUTS
+    for width, height, k in SHAPES:
+        boards = new_boards(n, width, height)
+        start = time.perf_counter()
+        winners = playouts(boards, 'X', width, height, k, np.random.default_rng(0))
+        batch_rate = n / (time.perf_counter() - start)
+        print(f"{width}x{height} k={k} numpy:  {batch_rate:10.0f} playouts/s  {rates(winners.tolist())}")
+
+        rng = random.Random(0)
+        start = time.perf_counter()
+        winners = []
+        for _ in range(PYTHON_PLAYOUTS):
+            winner, _ = play_game((width, height, k), (random_bot, random_bot), ('X', 'O'), rng)
+            winners.append(0 if winner is None else 1 - 2 * winner)
+        python_rate = PYTHON_PLAYOUTS / (time.perf_counter() - start)
+        print(f"{width}x{height} k={k} python: {python_rate:10.0f} playouts/s  {rates(winners)}  ({batch_rate / python_rate:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
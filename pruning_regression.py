@@ -0,0 +1,92 @@
+#node count regression check for the Scenario4 search
+#searches a few 5x5 positions to the same depth with the original search (full window for the
+#minimizer's children, board order, no table) and with Scenario4's search, checks both find the
+#same best score and that Scenario4 visits at most MAX_RATIO of the nodes
+#run with: python pruning_regression.py
+import sys
+
+from tictactoe import engine
+from tictactoe.engine import Engine
+
+MAX_RATIO = 0.25 #fail if the new search needs more than this share of the original's nodes
+WIN = engine.win_score(5, 5, 5) #the score of a win, as Engine(5) has it
+
+POSITIONS = [ #(cells taken by X, cells taken by O, marker to move, depth)
+    ([], [], 'X', 2),
+    ([12], [], 'O', 3),
+    ([12, 6], [0], 'O', 3),
+    ([12, 6, 18], [0, 24], 'O', 3),
+]
+
+
+def original_minimax(board, depth, is_maximizing, player, opponent, alpha, beta, max_depth, counter, last_move):
+    #the search as it was before window propagation and move ordering
+    counter[0] += 1
+    board_score = engine.score(board, player, opponent, last_move, WIN)
+    if board_score == WIN or board_score == -WIN:
+        return board_score
+    if board.is_full():
+        return 0
+    if depth >= max_depth:
+        return engine.heuristic_evaluation(board, player, opponent)
+    if is_maximizing:
+        best = -float('inf')
+        for move in board.empty_cells():
+            board.place(move, player)
+            best = max(best, original_minimax(board, depth + 1, False, player, opponent, alpha, beta, max_depth, counter, move))
+            board.undo(move, player)
+            alpha = max(alpha, best)
+            if beta <= alpha:
+                break
+        return best
+    else:
+        best = float('inf')
+        for move in board.empty_cells():
+            board.place(move, opponent)
+            best = min(best, original_minimax(board, depth + 1, True, player, opponent, -float('inf'), float('inf'), max_depth, counter, move))
+            board.undo(move, opponent)
+            beta = min(beta, best)
+            if beta <= alpha:
+                break
+        return best
+
+
+def original_search(board, player, opponent, max_depth):
+    counter = [0]
+    best = -float('inf')
+    for move in list(board.empty_cells()):
+        board.place(move, player)
+        best = max(best, original_minimax(board, 0, False, player, opponent, -float('inf'), float('inf'), max_depth, counter, move))
+        board.undo(move, player)
+    return best, counter[0]
+
+
+def new_search(board, player, opponent, max_depth):
+    budget = engine.Budget()
+    searcher = Engine(5)
+    searcher.endgame = None #node counts must not depend on whether the tablebase has been built
+    scores = searcher.search_root(board, player, max_depth, list(board.empty_cells()), budget)
+    return max(scores.values()), budget.nodes
+
+
+def main():
+    failed = False
+    total_original = total_new = 0
+    for x_cells, o_cells, mover, depth in POSITIONS:
+        board = Engine(5).new_board(sum(1 << c for c in x_cells), sum(1 << c for c in o_cells))
+        other = 'O' if mover == 'X' else 'X'
+        original_best, original_nodes = original_search(board, mover, other, depth)
+        new_best, new_nodes = new_search(board, mover, other, depth)
+        total_original += original_nodes
+        total_new += new_nodes
+        ok = original_best == new_best and new_nodes <= MAX_RATIO * original_nodes
+        failed = failed or not ok
+        print(f"X={x_cells} O={o_cells} {mover} to move, depth {depth}: "
+              f"{original_nodes} -> {new_nodes} nodes ({new_nodes / original_nodes:.1%}), "
+              f"best score {original_best} / {new_best} {'ok' if ok else 'FAIL'}")
+    print(f"Total: {total_original} -> {total_new} nodes ({total_new / total_original:.1%})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#load generator for the game server
+#starts game_server.py in its own process, then keeps the given number of games going at once for DURATION
+#seconds, each one playing random moves against ENGINE, and prints the p50/p99 time to answer a request and
+#the games finished per second
+#run with: python server_load.py [sessions ...]            (defaults to 1000 and 10000)
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import time
+
+SESSIONS = [1000, 10000]
+DURATION = 10.0 #seconds of play measured at each session count
+CONNECTIONS = 50 #the sessions are spread over this many connections
+ENGINE = "minimax" #any engine the server knows, alphabeta answers within the server's MOVE_TIME
+WIDTH, HEIGHT, K = 3, 3, 3
+
+
+class Connection: #one client connection, matches answers to the games waiting on them
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.waiting = {}
+        self.listener = asyncio.create_task(self.listen())
+
+    async def listen(self):
+        while line := await self.reader.readline():
+            game_id, cell, state = line.decode().split(maxsplit=2)
+            self.waiting.pop(game_id).set_result((cell, state.strip()))
+
+    async def send(self, game_id, request):
+        answer = asyncio.get_running_loop().create_future()
+        self.waiting[game_id] = answer
+        self.writer.write(request.encode())
+        return await answer
+
+    def close(self):
+        self.listener.cancel()
+        self.writer.close()
+
+
+async def session(connection, game_id, deadline, latencies, rng):
+    #plays games back to back until the deadline, returns how many finished
+    finished = 0
+    cells = WIDTH * HEIGHT
+    while time.perf_counter() < deadline:
+        player = rng.choice("XO")
+        taken = 0
+        request = f"new {game_id} {ENGINE} {WIDTH} {HEIGHT} {K} {player}\n"
+        while True:
+            start = time.perf_counter()
+            cell, state = await connection.send(game_id, request)
+            latencies.append(time.perf_counter() - start)
+            if cell == "error":
+                raise RuntimeError(f"server refused {request.strip()}: {state}")
+            if cell != "-1":
+                taken |= 1 << int(cell)
+            if state != "play":
+                break
+            move = rng.choice([c for c in range(cells) if not taken >> c & 1])
+            taken |= 1 << move
+            request = f"move {game_id} {move}\n"
+        finished += 1
+    return finished
+
+
+async def run(port, sessions):
+    connections = []
+    for _ in range(min(CONNECTIONS, sessions)):
+        connections.append(Connection(*await asyncio.open_connection("127.0.0.1", port)))
+    latencies = []
+    deadline = time.perf_counter() + DURATION
+    start = time.perf_counter()
+    finished = await asyncio.gather(*(session(connections[i % len(connections)], str(i), deadline, latencies, random.Random(i))
+                                      for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+    for connection in connections:
+        connection.close()
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    print(f"{sessions:6} sessions: {sum(finished) / elapsed:8.0f} games/s {len(latencies) / elapsed:8.0f} requests/s "
+          f"p50 {p50:7.2f}ms p99 {p99:7.2f}ms")
+
+
+def main():
+    sessions = [int(arg) for arg in sys.argv[1:]] or SESSIONS
+    server = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "game_server.py")], stdout=subprocess.PIPE, text=True)
+    try:
+        port = int(server.stdout.readline().rsplit(":", 1)[1])
+        for count in sessions:
+            asyncio.run(run(port, count))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
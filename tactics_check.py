@@ -0,0 +1,36 @@
+#checks the alphabeta engine takes a win and blocks one on big boards, where the heuristic can go past 10
+#every position is searched with depth caps 1 to 3 (and a node budget, so 15x15 stays quick) and the move played
+#has to be one of the expected cells
+#run with: python tactics_check.py
+import sys
+
+from tictactoe.engine import Engine
+
+NODES = 50000 #node budget for each search
+
+POSITIONS = [ #(name, width, height, k, cells taken by X, cells taken by O, marker to move, cells that are right)
+    #X has four in row 3 with both ends open and O has a piece in the middle of the board
+    ("7x7 take the win", 7, 7, 5, [22, 23, 24, 25], [16, 30, 31], 'X', [21, 26]),
+    #O has four in column 2 with the top end blocked by X, X must block the other end
+    ("7x7 block", 7, 7, 5, [2, 24, 25, 32], [9, 16, 23, 30], 'X', [37]),
+    ("15x15 take the win", 15, 15, 5, [110, 111, 112, 113], [96, 97, 126], 'X', [109, 114]),
+    ("15x15 block", 15, 15, 5, [96, 112, 113, 114], [111, 126, 141, 156], 'X', [171]),
+]
+
+
+def main():
+    failed = False
+    for name, width, height, k, x_cells, o_cells, mover, right in POSITIONS:
+        for depth in (1, 2, 3):
+            engine = Engine(width, height, k, max_depth=depth)
+            engine.endgame = engine.book = None
+            board = engine.new_board(sum(1 << c for c in x_cells), sum(1 << c for c in o_cells))
+            move, _ = engine.best_move(board, mover, node_budget=NODES)
+            ok = move in right
+            failed = failed or not ok
+            print(f"{name}, depth {depth}: played {divmod(move, width)} {'ok' if ok else 'FAIL'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#headless noughts and crosses engines: nothing in this package reads input or prints
+#engines are only imported the first time they are used, so importing the package itself is cheap
+#
+#    from tictactoe import best_move
+#    best_move(["X.O", ".X.", "..."], 'O')                              # -> (row, col)
+#    best_move(board, 'X', engine="alphabeta", budget=0.2, k=4)        # any size board, k in a row
+
+ENGINES = ("auto", "random", "rules", "minimax", "alphabeta", "mcts")
+MOVE_TIME = 1.0 #default budget in seconds for alphabeta and mcts
+
+engines = {} #alphabeta and mcts engines by their settings, kept so each keeps its table or tree between calls
+
+
+def get_engine(width, height=None, k=None, tt_size_mb=None, max_depth=None, workers=None):
+    #shared alphabeta Engine for this board shape and these settings
+    from .engine import TT_SIZE_MB, Engine
+    height = height or width
+    k = k or min(width, height)
+    tt_size_mb = tt_size_mb or TT_SIZE_MB
+    key = (width, height, k, tt_size_mb, max_depth, workers)
+    if key not in engines:
+        engines[key] = Engine(width, height, k, tt_size_mb, max_depth, workers)
+    return engines[key]
+
+
+def get_mcts(width, height=None, k=None):
+    #shared Monte Carlo tree search for this board shape, it reuses its tree when the next position follows on
+    from .mcts import MCTS
+    height = height or width
+    k = k or min(width, height)
+    key = ("mcts", width, height, k)
+    if key not in engines:
+        engines[key] = MCTS(width, height, k)
+    return engines[key]
+
+
+def best_move(position, mark, engine="auto", budget=None, k=None, rng=None):
+    #returns the (row, col) for mark to play, the position itself is never changed
+    #position is the board as rows, each a list or string of cells, anything but 'X' or 'O' is empty
+    #engine is one of ENGINES, "auto" is minimax on 3x3 and alphabeta otherwise
+    #budget is the thinking time in seconds for alphabeta and mcts, rng a random.Random for the random and rules engines
+    height, width = len(position), len(position[0])
+    if not any(cell not in ['X', 'O'] for row in position for cell in row):
+        raise ValueError("the board is full")
+    if engine == "auto":
+        engine = "minimax" if width == height == 3 and k in (None, 3) else "alphabeta"
+
+    if engine == "random":
+        import random
+        from .randombot import random_move
+        return random_move(position, rng or random)
+    if engine == "rules":
+        import random
+        from .rules import rule_move
+        return rule_move(position, mark, rng or random, k)
+    if engine == "minimax":
+        if not (width == height == 3 and k in (None, 3)):
+            raise ValueError("the minimax engine only plays 3x3")
+        from . import minimax3
+        return minimax3.best_move(position, mark)
+    if engine == "alphabeta":
+        from .bitboard import LineCountBoard
+        board = LineCountBoard.from_board(position, k)
+        cell, _ = get_engine(width, height, board.k).best_move(board, mark, MOVE_TIME if budget is None else budget)
+        return divmod(cell, width)
+    if engine == "mcts":
+        from .bitboard import Bitboard
+        board = Bitboard.from_board(position, k)
+        cell, _ = get_mcts(width, height, board.k).best_move(board, mark, MOVE_TIME if budget is None else budget)
+        return divmod(cell, width)
+    raise ValueError(f"unknown engine {engine!r}, expected one of {', '.join(ENGINES)}")
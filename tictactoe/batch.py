@@ -0,0 +1,97 @@
+#random playouts for many boards at once with numpy (pip install numpy), nothing else in the package needs it
+#boards are an (N, cells) int8 array holding 1 for X, -1 for O and 0 for empty, and each board's random game is
+#played in one go (see play_chunk). Wins come from one matrix product of the boards against a (cells, lines)
+#matrix that has a 1 where a cell is in a line, so a line sum of k or -k is a completed line
+import numpy as np
+
+from .bitboard import line_masks
+
+LINE_MATRICES = {} #(width, height, k) -> float32 (cells, lines) matrix, built once
+LINE_CELLS = {} #(width, height, k) -> (lines, k) array of the cells in each line
+CHUNK = 1 << 16 #boards played at a time, keeps the per line arrays in cache
+
+
+def line_matrix(width, height, k):
+    if (width, height, k) not in LINE_MATRICES:
+        lines = line_masks(width, height, k)
+        matrix = np.zeros((width * height, len(lines)), dtype=np.float32) #float so the product goes through BLAS
+        for j, line in enumerate(lines):
+            for cell in range(width * height):
+                if line >> cell & 1:
+                    matrix[cell, j] = 1
+        LINE_MATRICES[(width, height, k)] = matrix
+    return LINE_MATRICES[(width, height, k)]
+
+
+def line_cells(width, height, k):
+    if (width, height, k) not in LINE_CELLS:
+        LINE_CELLS[(width, height, k)] = np.array(
+            [[cell for cell in range(width * height) if line >> cell & 1] for line in line_masks(width, height, k)], dtype=np.intp)
+    return LINE_CELLS[(width, height, k)]
+
+
+def new_boards(n, width=3, height=None, x=0, o=0):
+    #n copies of the position with X on the cells set in x and O on those in o
+    cells = width * (height or width)
+    board = np.zeros(cells, dtype=np.int8)
+    for cell in range(cells):
+        if x >> cell & 1:
+            board[cell] = 1
+        elif o >> cell & 1:
+            board[cell] = -1
+    return np.tile(board, (n, 1))
+
+
+def playouts(boards, mover, width=3, height=None, k=None, rng=None):
+    #plays every board out with random moves, mover is 'X' or 'O' (the same for every board) or an int8 array of 1s
+    #and -1s, returns an int8 array of the winners (1 X, -1 O, 0 draw). Boards are played in place, up to the
+    #winning move. Lines already complete before the playout are ignored, only wins made during it count
+    height = height or width
+    k = k or min(width, height)
+    rng = rng or np.random.default_rng()
+    if isinstance(mover, str):
+        mover = np.full(len(boards), 1 if mover == 'X' else -1, dtype=np.int8)
+    else:
+        mover = np.asarray(mover, dtype=np.int8)
+    winners = np.empty(len(boards), dtype=np.int8)
+    for start in range(0, len(boards), CHUNK):
+        end = start + CHUNK
+        winners[start:end] = play_chunk(boards[start:end], mover[start:end], width, height, k, rng)
+    return winners
+
+
+def play_chunk(boards, mover, width, height, k, rng):
+    #the whole game at once: a random priority per cell orders the empty cells, which is the order a player
+    #picking uniformly among the empty cells would fill them, and the players take turns along that order.
+    #The filled board's line sums say which lines each player completes, the last of a line's cells to be filled
+    #says when, and the game ends at the first line completed
+    n, cells = boards.shape
+    rows = np.arange(n)[:, None]
+    empty = boards == 0
+    priority = rng.random((n, cells), dtype=np.float32)
+    priority[~empty] = -1
+    order = priority.argsort(axis=1)
+    times = np.empty((n, cells), dtype=np.int16)
+    times[rows, order] = np.arange(cells, dtype=np.int16) - (cells - empty.sum(axis=1, dtype=np.int16))[:, None]
+    #times counts the moves of the playout from 0, cells taken beforehand have negative times
+    side = np.where(times & 1, -mover[:, None], mover[:, None]).astype(np.int8)
+    filled = np.where(empty, side, boards)
+
+    sums = filled @ line_matrix(width, height, k)
+    complete = np.abs(sums) == k
+    finished = times[:, line_cells(width, height, k)].max(axis=2) #(n, lines) move that completes each line
+    finished[~complete | (finished < 0)] = cells
+    first = finished.argmin(axis=1)
+    end = finished[np.arange(n), first]
+    winners = np.where(end < cells, np.sign(sums[np.arange(n), first]), 0).astype(np.int8)
+    boards[...] = np.where(times <= end[:, None], filled, boards)
+    return winners
+
+
+def playout_results(n, mark, width=3, height=None, k=None, x=0, o=0, rng=None):
+    #plays n random games on from the position, mark to move, returns (wins, draws, losses) for mark
+    winners = playouts(new_boards(n, width, height, x, o), mark, width, height, k, rng)
+    side = 1 if mark == 'X' else -1
+    wins = int((winners == side).sum())
+    losses = int((winners == -side).sum())
+    return wins, n - wins - losses, losses
@@ -0,0 +1,305 @@
+#bitboard version of the board used by the minimax engines
+#boards are width x height and a game is won with k in a row (3,3,3 is noughts and crosses, 5,5,5 is Scenario4)
+#cell (row, col) is bit number width * row + col, so X and O are each stored as one integer
+import random
+
+LINE_MASKS = {} #winning line masks per (width, height, k), built once
+CELL_LINES = {} #for each cell, the line masks that pass through it
+CELL_LINE_IDS = {} #for each cell, the positions in LINE_MASKS of the lines that pass through it
+CELL_LINE_CELLS = {} #for each cell, the (row, col) cells of every line through it, for the list of lists board
+LINE_CELL_IDS = {} #for each line, the cells in it
+ZOBRIST_KEYS = {} #random 64 bit keys per (width, height), one per cell for each marker
+
+
+def line_masks(width, height, k):
+    #returns the bit masks of every k long run of cells across, down and along both diagonals
+    if (width, height, k) not in LINE_MASKS:
+        lines = []
+        for row in range(height):
+            for col in range(width):
+                for step_row, step_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_row, end_col = row + step_row * (k - 1), col + step_col * (k - 1)
+                    if 0 <= end_row < height and 0 <= end_col < width:
+                        lines.append(sum(1 << (width * (row + step_row * i) + col + step_col * i) for i in range(k)))
+        LINE_MASKS[(width, height, k)] = tuple(lines)
+    return LINE_MASKS[(width, height, k)]
+
+
+def cell_line_ids(width, height, k):
+    if (width, height, k) not in CELL_LINE_IDS:
+        ids = [[] for _ in range(width * height)]
+        for i, line in enumerate(line_masks(width, height, k)):
+            #walk the bits of the line rather than every cell, so building this stays linear in the lines
+            while line:
+                low = line & -line
+                ids[low.bit_length() - 1].append(i)
+                line ^= low
+        CELL_LINE_IDS[(width, height, k)] = tuple(tuple(cell_ids) for cell_ids in ids)
+    return CELL_LINE_IDS[(width, height, k)]
+
+
+def cell_lines(width, height, k):
+    if (width, height, k) not in CELL_LINES:
+        lines = line_masks(width, height, k)
+        CELL_LINES[(width, height, k)] = tuple(tuple(lines[i] for i in ids) for ids in cell_line_ids(width, height, k))
+    return CELL_LINES[(width, height, k)]
+
+
+def cell_line_cells(width, height, k):
+    if (width, height, k) not in CELL_LINE_CELLS:
+        CELL_LINE_CELLS[(width, height, k)] = tuple(
+            tuple(tuple(divmod(i, width) for i in range(width * height) if line >> i & 1) for line in lines)
+            for lines in cell_lines(width, height, k))
+    return CELL_LINE_CELLS[(width, height, k)]
+
+
+def line_cell_ids(width, height, k):
+    #for each line, the cells in it
+    if (width, height, k) not in LINE_CELL_IDS:
+        LINE_CELL_IDS[(width, height, k)] = tuple(
+            tuple(cell for cell in range(width * height) if line >> cell & 1) for line in line_masks(width, height, k))
+    return LINE_CELL_IDS[(width, height, k)]
+
+
+def check_winner_at(board, mark, row, col, k=None):
+    #win check for the list of lists board that only looks at the lines through (row, col)
+    #only the piece just placed there can have completed a line, k defaults to the shorter side
+    height, width = len(board), len(board[0])
+    for line in cell_line_cells(width, height, k or min(width, height))[width * row + col]:
+        if all(board[r][c] == mark for r, c in line):
+            return True
+    return False
+
+
+def zobrist_keys(width, height):
+    #returns (x_keys, o_keys), seeded so hashes are the same in every run
+    if (width, height) not in ZOBRIST_KEYS:
+        rng = random.Random(width * 1000 + height)
+        x_keys = tuple(rng.getrandbits(64) for _ in range(width * height))
+        o_keys = tuple(rng.getrandbits(64) for _ in range(width * height))
+        ZOBRIST_KEYS[(width, height)] = (x_keys, o_keys)
+    return ZOBRIST_KEYS[(width, height)]
+
+
+class Bitboard:
+    def __init__(self, width, height=None, k=None, x=0, o=0):
+        self.width = width
+        self.height = height or width
+        self.k = k or min(self.width, self.height)
+        self.cells = self.width * self.height
+        self.full = (1 << self.cells) - 1
+        self.lines = line_masks(self.width, self.height, self.k)
+        self.cell_lines = cell_lines(self.width, self.height, self.k)
+        self.x_keys, self.o_keys = zobrist_keys(self.width, self.height)
+        self.x = x
+        self.o = o
+        self.hash = 0 #zobrist hash, updated on every place and undo
+        for cell in range(self.cells):
+            if x >> cell & 1:
+                self.hash ^= self.x_keys[cell]
+            elif o >> cell & 1:
+                self.hash ^= self.o_keys[cell]
+
+    @classmethod
+    def from_board(cls, board, k=None):
+        #converts the list of lists board used by the game loop
+        height, width = len(board), len(board[0])
+        x = o = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell == 'X':
+                    x |= 1 << (width * i + j)
+                elif cell == 'O':
+                    o |= 1 << (width * i + j)
+        return cls(width, height, k, x, o)
+
+    def copy(self):
+        return type(self)(self.width, self.height, self.k, self.x, self.o)
+
+    def place(self, cell, mark):
+        if mark == 'X':
+            self.x |= 1 << cell
+            self.hash ^= self.x_keys[cell]
+        else:
+            self.o |= 1 << cell
+            self.hash ^= self.o_keys[cell]
+
+    def undo(self, cell, mark):
+        if mark == 'X':
+            self.x &= ~(1 << cell)
+            self.hash ^= self.x_keys[cell]
+        else:
+            self.o &= ~(1 << cell)
+            self.hash ^= self.o_keys[cell]
+
+    def is_winner(self, mark):
+        pieces = self.x if mark == 'X' else self.o
+        for line in self.lines:
+            if pieces & line == line:
+                return True
+        return False
+
+    def wins_at(self, cell, mark):
+        #only checks the lines through cell, enough when cell holds the last piece placed
+        pieces = self.x if mark == 'X' else self.o
+        for line in self.cell_lines[cell]:
+            if pieces & line == line:
+                return True
+        return False
+
+    def is_full(self):
+        return self.x | self.o == self.full
+
+    def empty_cells(self):
+        #yields the empty cells from lowest to highest by scanning the free bits
+        free = self.full & ~(self.x | self.o)
+        while free:
+            low = free & -free
+            yield low.bit_length() - 1
+            free ^= low
+
+
+class LineCountBoard(Bitboard):
+    #Bitboard that also keeps the number of X and O pieces in every line, updated on place and undo
+    #so the piece count evaluation and the win check never have to scan the lines
+    def __init__(self, width, height=None, k=None, x=0, o=0):
+        super().__init__(width, height, k, x, o)
+        self.cell_line_ids = cell_line_ids(self.width, self.height, self.k)
+        self.x_counts = [(x & line).bit_count() for line in self.lines]
+        self.o_counts = [(o & line).bit_count() for line in self.lines]
+        self.x_total = sum(self.x_counts) #pieces summed over every line, the heuristic's raw score
+        self.o_total = sum(self.o_counts)
+        self.x_wins = self.x_counts.count(self.k) #lines that are full of one marker
+        self.o_wins = self.o_counts.count(self.k)
+
+    def place(self, cell, mark):
+        super().place(cell, mark)
+        line_ids = self.cell_line_ids[cell]
+        if mark == 'X':
+            counts = self.x_counts
+            self.x_total += len(line_ids)
+            for i in line_ids:
+                counts[i] += 1
+                if counts[i] == self.k:
+                    self.x_wins += 1
+        else:
+            counts = self.o_counts
+            self.o_total += len(line_ids)
+            for i in line_ids:
+                counts[i] += 1
+                if counts[i] == self.k:
+                    self.o_wins += 1
+
+    def undo(self, cell, mark):
+        super().undo(cell, mark)
+        line_ids = self.cell_line_ids[cell]
+        if mark == 'X':
+            counts = self.x_counts
+            self.x_total -= len(line_ids)
+            for i in line_ids:
+                if counts[i] == self.k:
+                    self.x_wins -= 1
+                counts[i] -= 1
+        else:
+            counts = self.o_counts
+            self.o_total -= len(line_ids)
+            for i in line_ids:
+                if counts[i] == self.k:
+                    self.o_wins -= 1
+                counts[i] -= 1
+
+    def is_winner(self, mark):
+        return (self.x_wins if mark == 'X' else self.o_wins) > 0
+
+    def wins_at(self, cell, mark):
+        counts = self.x_counts if mark == 'X' else self.o_counts
+        for i in self.cell_line_ids[cell]:
+            if counts[i] == self.k:
+                return True
+        return False
+
+
+class ThreatBoard(LineCountBoard):
+    #LineCountBoard that also indexes the open lines, those holding none of the other marker, by how full they are
+    #threats are open lines one short of k, so their empty cell wins (or must be blocked), and each cell counts
+    #the open lines through it that are two short, so a cell on two of them makes two threats at once (a fork)
+    def __init__(self, width, height=None, k=None, x=0, o=0):
+        super().__init__(width, height, k, x, o)
+        self.line_cells = line_cell_ids(self.width, self.height, self.k)
+        self.threats = {'X': set(), 'O': set()} #line ids
+        self.twos = {'X': set(), 'O': set()} #line ids of open lines two short of k
+        self.two_counts = {'X': [0] * self.cells, 'O': [0] * self.cells} #cell -> lines in twos through it
+        for i in range(len(self.lines)):
+            if not self.o_counts[i] and self.x_counts[i] >= self.k - 2:
+                self.move_line(i, 'X', -1, self.x_counts[i])
+            if not self.x_counts[i] and self.o_counts[i] >= self.k - 2:
+                self.move_line(i, 'O', -1, self.o_counts[i])
+
+    def move_line(self, i, mark, old, new):
+        #line i goes from old to new pieces of mark in the index, -1 when it is not open for mark
+        k = self.k
+        if old == k - 1:
+            self.threats[mark].discard(i)
+        elif old == k - 2:
+            self.twos[mark].discard(i)
+            counts = self.two_counts[mark]
+            for cell in self.line_cells[i]:
+                counts[cell] -= 1
+        if new == k - 1:
+            self.threats[mark].add(i)
+        elif new == k - 2:
+            self.twos[mark].add(i)
+            counts = self.two_counts[mark]
+            for cell in self.line_cells[i]:
+                counts[cell] += 1
+
+    def place(self, cell, mark):
+        #only the lines through cell change: they hold one more of mark, and are no longer open for the other marker
+        mine, theirs = (self.x_counts, self.o_counts) if mark == 'X' else (self.o_counts, self.x_counts)
+        other = 'O' if mark == 'X' else 'X'
+        low = self.k - 3 #lines with fewer pieces than this stay out of the index
+        for i in self.cell_line_ids[cell]:
+            if not theirs[i] and mine[i] >= low:
+                self.move_line(i, mark, mine[i], mine[i] + 1)
+            if not mine[i] and theirs[i] >= low + 1:
+                self.move_line(i, other, theirs[i], -1)
+        super().place(cell, mark)
+
+    def undo(self, cell, mark):
+        mine, theirs = (self.x_counts, self.o_counts) if mark == 'X' else (self.o_counts, self.x_counts)
+        other = 'O' if mark == 'X' else 'X'
+        low = self.k - 3
+        for i in self.cell_line_ids[cell]:
+            if not theirs[i] and mine[i] > low:
+                self.move_line(i, mark, mine[i], mine[i] - 1)
+            if mine[i] == 1 and theirs[i] >= low + 1:
+                self.move_line(i, other, -1, theirs[i])
+        super().undo(cell, mark)
+
+    def winning_cells(self, mark):
+        #the empty cells that complete a line for mark, lowest first
+        taken = self.x | self.o
+        return sorted({(self.lines[i] & ~taken).bit_length() - 1 for i in self.threats[mark]})
+
+    def fork_cells(self, mark):
+        #the empty cells where mark would make two threats with different winning cells, lowest first
+        taken = self.x | self.o
+        counts = self.two_counts[mark]
+        candidates = 0 #only the empty cells of lines in twos can be forks
+        for i in self.twos[mark]:
+            candidates |= self.lines[i]
+        candidates &= ~taken
+        forks = []
+        while candidates:
+            low = candidates & -candidates
+            candidates ^= low
+            cell = low.bit_length() - 1
+            if counts[cell] < 2:
+                continue
+            gaps = set()
+            for i in self.cell_line_ids[cell]:
+                if i in self.twos[mark]:
+                    gaps.add(self.lines[i] & ~taken & ~(1 << cell))
+            if len(gaps) > 1:
+                forks.append(cell)
+        return forks
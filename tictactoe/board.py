@@ -0,0 +1,38 @@
+#helpers for the list of lists board used by the game loops
+#a cell holding anything other than 'X' or 'O' (its label, '.', ' ') is empty
+from .bitboard import Bitboard
+
+
+def new_board(width=3, height=None):
+    #empty board with every cell labelled by its position number, 1 to width * height
+    height = height or width
+    return [[str(width * i + j + 1) for j in range(width)] for i in range(height)]
+
+
+def copy_board(position):
+    #list of lists copy of a board given as lists or strings of rows
+    return [list(row) for row in position]
+
+
+def check_winner(board, mark, k=None):
+    #checks for k in a row anywhere on the board, k defaults to the shorter side
+    return Bitboard.from_board(board, k).is_winner(mark)
+
+
+def check_draw(board):
+    #checks if there are any empty cells left on the board, if not then the game is a draw
+    for row in board:
+        for cell in row:
+            if cell not in ['X', 'O']:
+                return False
+    return True
+
+
+def get_empty_positions(board):
+    #returns a list of empty positions ( not filled with x or o ), marked by co-ordinates
+    empty_positions = []
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell not in ['X', 'O']:
+                empty_positions.append((i, j))
+    return empty_positions
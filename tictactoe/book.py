@@ -0,0 +1,152 @@
+#opening book: the engine's moves for the first few plies of a game, searched offline for much longer than a move
+#gets, so the opening (the slowest moves to search, and the same every game) is played at once
+#only the player to move's book move is followed: the positions are the start, then after every reply the other
+#player could make to a book move, and so on until PLIES pieces are down. Positions are folded by the board's
+#symmetries and keyed by the mover's pieces against the other player's, so one book serves both markers
+#
+#file layout: MAGIC, width, height, k, plies, then one 8 byte record per position in increasing order,
+#each (mover | other << cells) << 10 | depth searched << 5 | book move, with the position and the move in the
+#symmetry's canonical cells, in the machine's byte order. Square boards of up to 25 cells
+#build it with: python -m tictactoe.book [size] [k] [plies] [seconds] [processes]
+import mmap
+import os
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+
+from .bitboard import line_masks
+from .symmetry import canonical, from_canonical
+
+MAGIC = b"TTTB"
+HEADER = 8 #MAGIC and four bytes of settings, so the records start 8 byte aligned
+MAX_CELLS = 25 #two masks and the move have to fit in a record
+PLIES = 4 #positions with fewer pieces than this are in the book, the computer's first two moves whoever starts
+SECONDS = 10.0 #search time for each position in the book
+
+tables = {} #(width, height, k) -> Book, or None when there is no file
+searchers = {} #(size, k) -> Engine that searches the book's positions, one per process
+
+
+def table_path(width, height, k):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), f"book{width}x{height}k{k}.bin")
+
+
+class Book:
+    def __init__(self, data, width, height, k, plies):
+        self.data = data
+        self.records = memoryview(data)[HEADER:].cast('Q')
+        self.width = width
+        self.height = height
+        self.k = k
+        self.cells = width * height
+        self.plies = plies
+
+    def __len__(self):
+        return len(self.records)
+
+    def probe(self, x, o, mark):
+        #(cell, depth searched) of the book move for mark to move, None if the position is not in the book
+        if (x | o).bit_count() >= self.plies:
+            return None
+        mine, theirs = (x, o) if mark == 'X' else (o, x)
+        mine, theirs, symmetry = canonical(mine, theirs, self.width)
+        key = (mine | theirs << self.cells) << 10
+        i = bisect_left(self.records, key)
+        if i < len(self.records) and self.records[i] >> 10 == key >> 10:
+            record = self.records[i]
+            return from_canonical(record & 31, self.width, symmetry), record >> 5 & 31
+        return None
+
+
+def load(width, height=None, k=None):
+    #the memory mapped book for this board, None if it has not been built
+    height = height or width
+    k = k or min(width, height)
+    if (width, height, k) not in tables:
+        tables[(width, height, k)] = None
+        if width != height or width * height > MAX_CELLS:
+            return None
+        try:
+            with open(table_path(width, height, k), "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if data[:len(MAGIC)] != MAGIC or tuple(data[len(MAGIC):len(MAGIC) + 3]) != (width, height, k) \
+                or (len(data) - HEADER) % 8:
+            data.close()
+            return None
+        tables[(width, height, k)] = Book(data, width, height, k, data[len(MAGIC) + 3])
+    return tables[(width, height, k)]
+
+
+def search_position(size, k, mine, theirs, seconds):
+    #runs in a worker: (cell, depth) of the engine's move for the mover, searched for seconds
+    from .engine import Engine
+    if (size, k) not in searchers:
+        searchers[(size, k)] = Engine(size, size, k)
+        searchers[(size, k)].book = None #an older book must not answer for the search
+    engine = searchers[(size, k)]
+    return engine.best_move(engine.new_board(mine, theirs), 'X', seconds)
+
+
+def replies(size, k, mine, theirs, cell):
+    #the canonical positions after the mover plays cell and the other player answers, from the new mover's side
+    #positions where the game is already over are left out
+    lines = line_masks(size, size, k)
+    mine |= 1 << cell
+    if any(line & mine == line for line in lines):
+        return set()
+    positions = set()
+    for reply in range(size * size):
+        if (mine | theirs) >> reply & 1:
+            continue
+        answered = theirs | 1 << reply
+        if not any(line & answered == line for line in lines) and (mine | answered).bit_count() < size * size:
+            positions.add(canonical(mine, answered, size)[:2])
+    return positions
+
+
+def build(size=5, k=None, plies=PLIES, seconds=SECONDS, processes=None, path=None):
+    #searches every book position, a ply at a time as the book moves decide the next ply's positions,
+    #writes the book and returns the number of positions in it
+    k = k or size
+    cells = size * size
+    if cells > MAX_CELLS:
+        raise ValueError(f"{size}x{size} is too big for the book, the limit is {MAX_CELLS} cells")
+    path = path or table_path(size, size, k)
+    #the empty board for a computer that starts, every first move for one that does not
+    layers = [{(0, 0)}, {canonical(0, 1 << cell, size)[:2] for cell in range(cells)}]
+    moves = {} #(mover, other) -> (cell, depth)
+    pool = ProcessPoolExecutor(processes) if processes and processes > 1 else None
+    try:
+        for ply in range(plies):
+            positions = sorted(layers[ply])
+            args = [(size, k, mine, theirs, seconds) for mine, theirs in positions]
+            found = (pool.map if pool is not None else map)(search_position, *zip(*args)) if args else []
+            following = set()
+            for (mine, theirs), (cell, depth) in zip(positions, found):
+                moves[(mine, theirs)] = (cell, depth)
+                if ply + 2 < plies:
+                    following |= replies(size, k, mine, theirs, cell)
+            layers.append(following)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(bytes([size, size, k, plies]))
+        array('Q', sorted((mine | theirs << cells) << 10 | depth << 5 | cell
+                          for (mine, theirs), (cell, depth) in moves.items())).tofile(f)
+    tables.pop((size, size, k), None)
+    return len(moves)
+
+
+if __name__ == "__main__":
+    import sys
+    args = sys.argv[1:]
+    size = int(args[0]) if args else 5
+    k = int(args[1]) if len(args) > 1 else size
+    plies = int(args[2]) if len(args) > 2 else PLIES
+    seconds = float(args[3]) if len(args) > 3 else SECONDS
+    processes = int(args[4]) if len(args) > 4 else os.cpu_count()
+    print(f"Searched {build(size, k, plies, seconds, processes)} positions into {table_path(size, size, k)}")
@@ -0,0 +1,220 @@
+#endgame tablebase for boards too big to solve whole (5x5): exact results for positions with few empty cells left
+#listing every position with MAX_EMPTY or fewer empty cells is hopeless for 5x5 (about 4 * 10^8 with just two empty),
+#but the rest of the game only depends on the empty cells and, for each player, which sets of them would still
+#complete one of their lines (lines the other player has a piece in are dead). Where those cells are on the board
+#does not matter, so they are numbered 0, 1, 2... and a set that contains another is dropped, since the smaller one
+#is always completed first. Positions that reduce to the same sets have the same result, which folds the late
+#positions of 5x5 down to a few thousand endgames, and the ones with no sets left at all are draws without a lookup.
+#The table holds every endgame below the positions that sample games reach with MAX_EMPTY cells left
+#
+#file layout: MAGIC, width, height, k, max empty, then one 8 byte record per endgame in increasing order,
+#each (hash of the endgame's sets) << 2 | result for the player to move, in solved_table's codes and the machine's byte order
+#build it with: python -m tictactoe.endgame [width] [height] [k] [max empty] [games] [processes]
+import hashlib
+import mmap
+import os
+import random
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+
+from .bitboard import line_masks
+from .solved_table import DRAW, LOSS, WIN
+
+MAGIC = b"TTTE"
+HEADER = 8 #MAGIC and four bytes of settings, so the records start 8 byte aligned
+MAX_EMPTY = 10 #positions with this many empty cells or fewer are looked up
+GAMES = 2000 #sample games played to build the table
+BLOCK = 100 #games per block of work handed to each process
+
+tables = {} #(width, height, k) -> Tablebase, or None when there is no file
+
+
+def table_path(width, height, k):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), f"endgame{width}x{height}k{k}.bin")
+
+
+def minimal(sets):
+    #the sets with no other set inside them, sorted, as a tuple
+    kept = []
+    for s in sorted(set(sets), key=int.bit_count):
+        if not any(t & s == t for t in kept):
+            kept.append(s)
+    return tuple(sorted(kept))
+
+
+def reduce(x, o, mark, lines, full):
+    #(empty cells, mover's sets, other's sets) for mark to move, each set a mask over the empty cells numbered in order
+    empty = full & ~(x | o)
+    mine, theirs = (x, o) if mark == 'X' else (o, x)
+    mover_sets, other_sets = [], []
+    for line in lines:
+        if line & mine:
+            if not line & theirs:
+                mover_sets.append(line & empty)
+        elif line & theirs:
+            other_sets.append(line & empty)
+        else:
+            mover_sets.append(line & empty)
+            other_sets.append(line & empty)
+    #numbering the empty cells keeps their order, so the sets can be dropped and sorted before they are numbered
+    return empty.bit_count(), tuple(renumber(s, empty) for s in minimal(mover_sets)), \
+        tuple(renumber(s, empty) for s in minimal(other_sets))
+
+
+def renumber(cells, empty):
+    #cells as a mask over the empty cells, the lowest empty cell being bit 0
+    numbered = 0
+    while cells:
+        low = cells & -cells
+        numbered |= 1 << (empty & (low - 1)).bit_count()
+        cells ^= low
+    return numbered
+
+
+def endgame_key(empty, mover_sets, other_sets):
+    #62 bit hash of a reduced endgame, collisions are as unlikely as in the transposition table's 64 bit keys
+    data = array('H', (empty, len(mover_sets), *mover_sets, *other_sets)).tobytes()
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little") >> 2
+
+
+def play(empty, mover_sets, other_sets, cell):
+    #the endgame after the mover takes cell, from the other player's side, or None if that completes a set
+    bit = 1 << cell
+    low = bit - 1
+
+    def close_up(s):
+        #the cells above the one taken move down a number
+        return s & low | (s >> (cell + 1)) << cell
+
+    if bit in mover_sets:
+        return None
+    return (empty - 1, minimal(close_up(s) for s in other_sets if not s & bit),
+            minimal(close_up(s & ~bit) for s in mover_sets))
+
+
+def solve(empty, mover_sets, other_sets, results):
+    #result for the player to move, every endgame below this one is solved too and added to results by key
+    if not mover_sets and not other_sets:
+        return DRAW #nobody can complete a line any more
+    key = endgame_key(empty, mover_sets, other_sets)
+    if key in results:
+        return results[key]
+    best = LOSS
+    for cell in range(empty):
+        child = play(empty, mover_sets, other_sets, cell)
+        if child is None:
+            best = WIN
+        elif child[0] == 0:
+            best = max(best, DRAW)
+        else:
+            best = max(best, 4 - solve(*child, results)) #the other player's loss is our win
+    results[key] = best
+    return best
+
+
+class Tablebase:
+    def __init__(self, data, width, height, k, max_empty):
+        self.data = data
+        self.records = memoryview(data)[HEADER:].cast('Q')
+        self.width = width
+        self.height = height
+        self.k = k
+        self.cells = width * height
+        self.full = (1 << self.cells) - 1
+        self.lines = line_masks(width, height, k)
+        self.max_empty = max_empty
+        self.min_pieces = self.cells - max_empty #positions with fewer pieces than this are never looked up
+
+    def __len__(self):
+        return len(self.records)
+
+    def probe(self, x, o, mark):
+        #LOSS, DRAW or WIN for mark to move, None if the position's endgame is not in the table
+        empty, mover_sets, other_sets = reduce(x, o, mark, self.lines, self.full)
+        if not mover_sets and not other_sets:
+            return DRAW
+        key = endgame_key(empty, mover_sets, other_sets) << 2
+        i = bisect_left(self.records, key)
+        if i < len(self.records) and self.records[i] >> 2 == key >> 2:
+            return self.records[i] & 3
+        return None
+
+
+def load(width, height=None, k=None):
+    #the memory mapped tablebase for this board, None if it has not been built
+    height = height or width
+    k = k or min(width, height)
+    if (width, height, k) not in tables:
+        tables[(width, height, k)] = None
+        try:
+            with open(table_path(width, height, k), "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if data[:len(MAGIC)] != MAGIC or tuple(data[len(MAGIC):len(MAGIC) + 3]) != (width, height, k) \
+                or (len(data) - HEADER) % 8:
+            data.close()
+            return None
+        tables[(width, height, k)] = Tablebase(data, width, height, k, data[len(MAGIC) + 3])
+    return tables[(width, height, k)]
+
+
+def solve_block(width, height, k, max_empty, seed, block, games):
+    #runs in a worker: plays games rules bot against rules bot (random where no rule applies, and either marker
+    #first) until max_empty cells are left, and solves every endgame below each position reached
+    from .selfplay import rules_bot
+    shape = (width, height, k)
+    lines = line_masks(width, height, k)
+    cells = width * height
+    rng = random.Random(seed * 1000003 + block)
+    results = {}
+    for _ in range(games):
+        x = o = 0
+        mark = rng.choice('XO')
+        for _ in range(cells - max_empty):
+            cell = rules_bot(shape, x, o, mark, rng)
+            if mark == 'X':
+                x |= 1 << cell
+            else:
+                o |= 1 << cell
+            if any(line & (x if mark == 'X' else o) == line for line in lines if line >> cell & 1):
+                break
+            mark = 'O' if mark == 'X' else 'X'
+        else:
+            solve(*reduce(x, o, mark, lines, (1 << cells) - 1), results)
+    return results
+
+
+def build(width=5, height=None, k=None, max_empty=MAX_EMPTY, games=GAMES, processes=None, seed=0, path=None):
+    #plays the sample games, solves their endgames and writes the table, returns the number of endgames
+    height = height or width
+    k = k or min(width, height)
+    path = path or table_path(width, height, k)
+    blocks = [(width, height, k, max_empty, seed, block, min(BLOCK, games - block * BLOCK)) for block in range(-(-games // BLOCK))]
+    results = {}
+    if processes and processes > 1:
+        with ProcessPoolExecutor(processes) as pool:
+            for block_results in pool.map(solve_block, *zip(*blocks)):
+                results.update(block_results)
+    else:
+        for args in blocks:
+            results.update(solve_block(*args))
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(bytes([width, height, k, max_empty]))
+        array('Q', sorted(key << 2 | result for key, result in results.items())).tofile(f)
+    tables.pop((width, height, k), None)
+    return len(results)
+
+
+if __name__ == "__main__":
+    import sys
+    args = [int(arg) for arg in sys.argv[1:]]
+    width = args[0] if args else 5
+    height = args[1] if len(args) > 1 else width
+    k = args[2] if len(args) > 2 else min(width, height)
+    max_empty = args[3] if len(args) > 3 else MAX_EMPTY
+    games = args[4] if len(args) > 4 else GAMES
+    processes = args[5] if len(args) > 5 else os.cpu_count()
+    print(f"Solved {build(width, height, k, max_empty, games, processes)} endgames into {table_path(width, height, k)}")
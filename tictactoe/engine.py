@@ -0,0 +1,320 @@
+#alpha-beta search shared by every board size
+#an Engine plays one m,n,k game: k in a row wins on a width x height board
+import time
+
+from . import book, endgame, retrograde
+from .bitboard import LineCountBoard, line_masks
+from .solved_table import DRAW, LOSS, WIN
+from .transposition import EXACT, LOWER, UPPER, TranspositionTable, position_key
+
+TT_SIZE_MB = 64  #default memory cap for each engine's transposition table
+
+"""PSUEDOCODE
+function minimax(node, depth, isMaximizingPlayer, alpha, beta):
+
+    if node is a leaf node :
+        return value of the node
+
+    if isMaximizingPlayer :
+        bestVal = -INFINITY
+        for each child node :
+            value = minimax(node, depth+1, false, alpha, beta)
+            bestVal = max( bestVal, value)
+            alpha = max( alpha, bestVal)
+            if beta <= alpha:
+                break
+        return bestVal
+
+    else :
+        bestVal = +INFINITY
+        for each child node :
+            value = minimax(node, depth+1, true, alpha, beta)
+            bestVal = min( bestVal, value)
+            beta = min( beta, bestVal)
+            if beta <= alpha:
+                break
+        return bestVal"""
+
+
+def win_score(width, height, k):
+    #a win has to outscore any heuristic value, which is at most every line full of one marker's pieces
+    return len(line_masks(width, height, k)) * k + 1
+
+
+def score(board, player, opponent, last_move=None, win=10): #keep a score, which is important for a minimax algorithm
+    #win is the score of a win, the 3x3 minimax searches to the end and keeps 10, an Engine passes its win_score
+    if last_move is None: #no last move to go by, so check every line
+        if board.is_winner(player):
+            return win
+        elif board.is_winner(opponent):
+            return -win
+        return 0
+    #otherwise only the piece at last_move can have just won, so only its lines are checked
+    last_mark = 'X' if board.x >> last_move & 1 else 'O'
+    if board.wins_at(last_move, last_mark):
+        return win if last_mark == player else -win
+    else:
+        return 0
+
+
+def heuristic_evaluation(board, player, opponent):
+    #pieces in every winning line, the LineCountBoard keeps these totals up to date on each move
+    if player == 'X':
+        return board.x_total - board.o_total
+    return board.o_total - board.x_total
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Budget: #time and node limits for one computer move
+    #the deadline is wall clock time so it means the same thing in the parallel search's worker processes
+    def __init__(self, seconds=None, nodes=None, deadline=None, stop=None):
+        self.deadline = time.time() + seconds if seconds is not None else deadline
+        self.node_limit = nodes
+        self.stop = stop #optional threading.Event, setting it ends the search as if time had run out
+        self.nodes = 0
+
+    def tick(self):
+        #called once per node, raises SearchTimeout when the move has used up its budget
+        self.nodes += 1
+        if self.node_limit is not None and self.nodes > self.node_limit:
+            raise SearchTimeout
+        if self.nodes & 1023 == 0:
+            if self.deadline is not None and time.time() > self.deadline:
+                raise SearchTimeout
+            if self.stop is not None and self.stop.is_set():
+                raise SearchTimeout
+
+
+class Engine:
+    def __init__(self, width, height=None, k=None, tt_size_mb=TT_SIZE_MB, max_depth=None, workers=None):
+        self.width = width
+        self.height = height or width
+        self.k = k or min(self.width, self.height)
+        self.tt_size_mb = tt_size_mb
+        self.max_depth = max_depth #optional cap on the iterative deepening
+        self.workers = workers #search the root moves across a pool of this many processes, None searches here
+        self.parallel = None #the process pool, started on the first parallel search
+        self.searches = 0 #number of best_move calls, tells the workers when to start a fresh table
+        self.transposition_table = TranspositionTable(tt_size_mb) #kept between moves, positions are keyed by who moves and whose score it is
+        self.killer_moves = {} #depth -> the last two moves that caused a cutoff there, cleared every move
+        self.history = {} #(marker, cell) -> how often (weighted by depth) that move caused a cutoff, halved every move
+        self.win_score = win_score(self.width, self.height, self.k)
+        self.endgame_scores = {WIN: self.win_score, DRAW: 0, LOSS: -self.win_score} #tablebase result for the mover -> its score
+        #boards small enough to be solved outright play from the table when it has been built, see retrograde.py
+        self.solved = retrograde.load(self.width, self.height, self.k) if self.width * self.height <= retrograde.MAX_CELLS else None
+        #bigger boards look late positions up in the endgame tablebase when it has been built, see endgame.py
+        self.endgame = endgame.load(self.width, self.height, self.k) if self.solved is None else None
+        #and play their first moves from the opening book when it has been built, see book.py, unless max_depth caps
+        #the search: the book's moves were searched deeper than that
+        self.book = book.load(self.width, self.height, self.k) if self.solved is None else None
+
+    def new_board(self, x=0, o=0):
+        return LineCountBoard(self.width, self.height, self.k, x, o)
+
+    def minimax(self, board, depth, is_maximizing, player, opponent, alpha, beta, max_depth, budget=None, last_move=None):
+        #node, cutoff and table counts come from stats.SearchStats, which wraps this method while it is attached
+
+        if budget is not None:
+            budget.tick()
+
+        #evaluate the current board state
+        board_score = score(board, player, opponent, last_move, self.win_score)
+
+        #check if the game is won or lost and return the score
+        if board_score == self.win_score or board_score == -self.win_score:
+            return board_score
+
+        #return 0 if draw
+        if board.is_full():
+            return 0
+
+        if depth >= max_depth:
+            return heuristic_evaluation(board, player, opponent)
+
+        #a position far enough into the game may be in the endgame tablebase, which has its exact score. Leaves are
+        #not looked up: a lookup costs more than the heuristic, and only above them does a hit save a whole search
+        tablebase = self.endgame
+        if tablebase is not None and (board.x | board.o).bit_count() >= tablebase.min_pieces:
+            result = tablebase.probe(board.x, board.o, player if is_maximizing else opponent)
+            if result is not None:
+                return self.endgame_scores[result] if is_maximizing else -self.endgame_scores[result]
+
+        #look the position up in the transposition table, a deep enough entry can end the search here
+        remaining = max_depth - depth
+        key = position_key(board, player if is_maximizing else opponent, player)
+        entry = self.transposition_table.lookup(key)
+        tt_move = None
+        if entry is not None:
+            entry_depth, entry_value, bound, tt_move = entry
+            if entry_depth >= remaining:
+                if bound == EXACT:
+                    return entry_value
+                elif bound == LOWER:
+                    alpha = max(alpha, entry_value)
+                else:
+                    beta = min(beta, entry_value)
+                if beta <= alpha:
+                    return entry_value
+        window_alpha, window_beta = alpha, beta
+        best_move = None
+
+        # if maximizing is true ( computer's turn )
+        if is_maximizing:
+            # initialise best to negative infinity to ensure any valid move will be higher
+            best = -float('inf')
+
+            #iterate over all empty positions, most promising first
+            for move in self.ordered_moves(board, tt_move, depth, player):
+                #simluates move by placing computer's marker
+                board.place(move, player)
+
+                # recursively calls minimax for the next move with the minimizing
+                value = self.minimax(board, depth + 1, False, player, opponent, alpha, beta, max_depth, budget, move)
+
+                #resets position
+                board.undo(move, player)
+
+                if value > best:
+                    best = value
+                    best_move = move
+
+                alpha = max(alpha, best)
+
+                if beta <= alpha:
+                    self.record_cutoff(move, depth, remaining, player)
+                    break
+        else:
+            # for the human player's turn (minimizer), initialise best to positive infinity
+            best = float('inf')
+
+            for move in self.ordered_moves(board, tt_move, depth, opponent):
+                board.place(move, opponent)
+
+                # recursively calls minimax for the next move with the minimizing - taking the minimum move (where the opponent does not win)
+                value = self.minimax(board, depth + 1, True, player, opponent, alpha, beta, max_depth, budget, move)
+
+                board.undo(move, opponent)
+
+                if value < best:
+                    best = value
+                    best_move = move
+
+                beta = min(beta, best)
+                if beta <= alpha:
+                    self.record_cutoff(move, depth, remaining, opponent)
+                    break
+
+        #store the result with the kind of bound it is for the window that was searched
+        if best <= window_alpha:
+            bound = UPPER
+        elif best >= window_beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.transposition_table.store(key, remaining, best, bound, best_move)
+
+        # returns best score
+        return best
+
+    def ordered_moves(self, board, tt_move, depth, mark):
+        #table move first, then killer moves, then the rest by history score
+        #ties go to the cells on the most lines, so the centre comes first on an empty board
+        lines = board.cell_line_ids
+        history = self.history
+        moves = sorted(board.empty_cells(), key=lambda move: (history.get((mark, move), 0), len(lines[move])), reverse=True)
+        for first in self.killer_moves.get(depth, [])[::-1] + [tt_move]:
+            if first is not None and first in moves:
+                moves.remove(first)
+                moves.insert(0, first)
+        return moves
+
+    def record_cutoff(self, move, depth, remaining, mark):
+        killers = self.killer_moves.setdefault(depth, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        self.history[(mark, move)] = self.history.get((mark, move), 0) + remaining * remaining
+
+    def search_root(self, board, mark, max_depth, root_moves, budget=None):
+        #scores every root move to max_depth, returns {move: score}
+        #moves after the first only need to show they beat the best so far, so they may return an upper bound
+        opponent = 'X' if mark == 'O' else 'O'
+        scores = {}
+        alpha = -float('inf')
+        for move in root_moves:
+            board.place(move, mark)  # simulate move by placing computer marker
+            scores[move] = self.minimax(board, 0, False, mark, opponent, alpha, float('inf'), max_depth, budget, move)  # evaluate with minimax
+            board.undo(move, mark)  #undo move
+            alpha = max(alpha, scores[move])
+        return scores
+
+    def best_move(self, board, mark, time_budget=None, node_budget=None, stop=None):
+        #iterative deepening: search depth 0, 1, 2... until the time or node budget runs out or stop is set
+        #returns (cell, depth) for the best move of the deepest search that finished
+        #with workers the node budget applies to each root move on its own, and stop is only seen between depths
+        root_moves = list(board.empty_cells())
+        if self.book is not None and self.max_depth is None:
+            booked = self.book.probe(board.x, board.o, mark)
+            if booked is not None:
+                return booked #searched offline, to the depth it gives
+        if self.solved is not None:
+            solved = self.solved.best_move(board.x, board.o, mark)
+            if solved is not None:
+                return solved[1], len(root_moves) #the table already looked to the end of the game
+        self.killer_moves.clear()
+        for key in self.history:
+            self.history[key] //= 2
+        self.searches += 1
+        if self.workers and self.parallel is None:
+            from .parallel import ParallelSearch #only pay for multiprocessing when it is used
+            self.parallel = ParallelSearch(self.workers)
+        last_depth = len(root_moves) - 1 #deeper than this there is nothing left to search
+        if self.max_depth is not None:
+            last_depth = min(last_depth, self.max_depth)
+
+        #depth 0 always runs in full so there is a move to play however small the budget
+        scores = self.search_root(board.copy(), mark, 0, root_moves)
+        depth_reached = 0
+        budget = Budget(time_budget, node_budget, stop=stop)
+
+        for depth in range(1, last_depth + 1):
+            if stop is not None and stop.is_set():
+                break
+            #the best move from the previous depth is searched first, the rest keep their order
+            best_move = pick_best(scores, root_moves)
+            if scores[best_move] == self.win_score: #a forced win was found, searching deeper cannot improve it
+                break
+            root_moves.remove(best_move)
+            root_moves.insert(0, best_move)
+            try:
+                if self.parallel is not None:
+                    scores = self.parallel.search_root(self, board, mark, depth, root_moves, budget.deadline, node_budget)
+                else:
+                    #a search cut off by the budget leaves its board half played, so each depth gets a copy
+                    scores = self.search_root(board.copy(), mark, depth, root_moves, budget)
+            except SearchTimeout:
+                break
+            depth_reached = depth
+
+        #pick the best move of the last depth that finished
+        return pick_best(scores, root_moves), depth_reached
+
+    def close(self):
+        #stops the worker processes, if there are any
+        if self.parallel is not None:
+            self.parallel.close()
+            self.parallel = None
+
+
+def pick_best(scores, root_moves):
+    #first root move with the highest score, so ties always go the same way
+    best_val = -float('inf')
+    best_move = None
+    for move in root_moves:
+        if scores[move] > best_val:
+            best_move = move
+            best_val = scores[move]
+    return best_move
@@ -0,0 +1,162 @@
+#Scenario3's full depth minimax for the 3x3 game, which also gives the game tree it searched
+#the tree is stored in flat parallel arrays indexed by node number (parent, move, score, position, and where
+#each node's children start), with node 0 the position the computer is to move in. Nodes are only created when they are
+#asked for, so printing the first two levels only ever builds those levels, and every score comes from the
+#memoized minimax in minimax3.py rather than searching each branch again
+from array import array
+
+from .bitboard import Bitboard
+from .engine import score #board is a Bitboard here
+from .minimax3 import minimax
+
+values = {} #(x, o, marker to move) -> minimax score for that marker, shared by every tree
+last_tree = None #the tree of the last best_move, reused when the next position follows on from it
+
+
+class GameTree:
+    def __init__(self, board, computer_marker):
+        root = Bitboard.from_board(board)
+        self.width = root.width
+        self.lines = root.cell_lines
+        self.player = computer_marker
+        self.opponent = 'X' if computer_marker == 'O' else 'O'
+        self.root_pieces = (root.x | root.o).bit_count()
+        self.parent = array('i', [-1])
+        self.move = array('b', [-1]) #cell played to reach the node
+        self.score = array('b', [self.value(root.x, root.o, self.player, score(root, self.player, self.opponent))])
+        self.position = array('I', [root.x | root.o << root.cells]) #x and o of the node, o shifted above x (3x3 fits 32 bits)
+        self.first_child = array('i', [-1]) #-1 until the node's children have been made
+        self.child_count = array('B', [0])
+        self.won = score(root, self.player, self.opponent) != 0 #the root is already a finished game
+        self.root = 0 #node of the position the computer is to move in, moves on as the game does (see advance)
+
+    def __len__(self):
+        return len(self.move)
+
+    def value(self, x, o, mover, board_score):
+        #minimax score for the computer with mover to play, board_score is 10 or -10 if the game is already won
+        if board_score:
+            return board_score
+        if (x | o).bit_count() == len(self.lines):
+            return 0
+        key = (x, o, mover)
+        if key not in values:
+            other = 'X' if mover == 'O' else 'O'
+            values[key] = minimax(Bitboard(self.width, x=x, o=o), 0, True, mover, other)
+        return values[key] if mover == self.player else -values[key]
+
+    def children(self, node):
+        #the node numbers of a node's children, one per empty cell in cell order, made the first time they are asked for
+        if self.first_child[node] < 0:
+            cells = len(self.lines)
+            position = self.position[node]
+            first = len(self.move)
+            last_move = self.move[node] if node else None
+            x, o = position & ((1 << cells) - 1), position >> cells
+            for move, child_x, child_o, child_score in self.child_positions(x, o, last_move, self.score[node]):
+                self.parent.append(node)
+                self.move.append(move)
+                self.score.append(child_score)
+                self.position.append(child_x | child_o << cells)
+                self.first_child.append(-1)
+                self.child_count.append(0)
+            self.first_child[node] = first
+            self.child_count[node] = len(self.move) - first
+        return range(self.first_child[node], self.first_child[node] + self.child_count[node])
+
+    def child_positions(self, x, o, move, node_score):
+        #yields (move, x, o, score) for each move from the position reached by move (None for the root), in cell order
+        #nothing follows a finished game, a node's own move is the only one that can have just won it
+        if self.won if move is None else abs(node_score) == 10 and self.wins(x, o, move):
+            return
+        mover = self.player if ((x | o).bit_count() - self.root_pieces) % 2 == 0 else self.opponent
+        next_mover = 'X' if mover == 'O' else 'O'
+        for move in range(len(self.lines)):
+            if (x | o) >> move & 1:
+                continue
+            child_x, child_o = (x | 1 << move, o) if mover == 'X' else (x, o | 1 << move)
+            board_score = 0
+            if self.wins(child_x, child_o, move):
+                board_score = 10 if mover == self.player else -10
+            yield move, child_x, child_o, self.value(child_x, child_o, next_mover, board_score)
+
+    def advance(self, board):
+        #moves the root on to the node for a list of lists board reached by moves from the current root,
+        #with the computer to move again. Returns False, leaving the tree as it was, if it is not one
+        target = Bitboard.from_board(board)
+        cells = len(self.lines)
+        node = self.root
+        x, o = self.position[node] & ((1 << cells) - 1), self.position[node] >> cells
+        if target.x & x != x or target.o & o != o or ((target.x | target.o).bit_count() - self.root_pieces) % 2:
+            return False
+        while (x, o) != (target.x, target.o):
+            for child in self.children(node):
+                child_x, child_o = self.position[child] & ((1 << cells) - 1), self.position[child] >> cells
+                if target.x & child_x == child_x and target.o & child_o == child_o:
+                    break
+            else:
+                return False
+            node, x, o = child, child_x, child_o
+        self.root = node
+        return True
+
+    def wins(self, x, o, move):
+        #True if the piece on move completes a line
+        bits = x if x >> move & 1 else o
+        return any(line & bits == line for line in self.lines[move])
+
+    def cell(self, node):
+        #(row, col) of the move that reached a node
+        return divmod(self.move[node], self.width)
+
+    def walk(self, node=None, max_depth=None):
+        #yields (depth, node) for everything below node (the root if None), depth first in cell order, down to max_depth levels
+        #(None for the whole tree). Nodes are made as the walk reaches them
+        stack = [(0, child) for child in reversed(self.children(self.root if node is None else node))]
+        while stack:
+            depth, node = stack.pop()
+            yield depth, node
+            if max_depth is None or depth + 1 < max_depth:
+                stack.extend((depth + 1, child) for child in reversed(self.children(node)))
+
+    def stream(self, max_depth=None, pv=False, top_k=None):
+        #yields (id, parent id, depth, cell, score) for the root (id 0, depth 0, cell -1) and every node below it,
+        #depth first, as the search reaches them and without keeping them: memory only grows with the depth
+        #max_depth limits the levels below the root, top_k keeps only the k best children of each node for
+        #the player choosing there, and pv keeps only the best one (the principal variation). With either
+        #filter children come best first, otherwise in cell order. Ids number the nodes in the order they come out
+        cells = len(self.lines)
+        position = self.position[self.root]
+        root_move = self.move[self.root] if self.root else None
+        stack = [(-1, 0, position & ((1 << cells) - 1), position >> cells, root_move, self.score[self.root])]
+        next_id = 0
+        keep = 1 if pv else top_k
+        while stack:
+            parent, depth, x, o, move, node_score = stack.pop()
+            node = next_id
+            next_id += 1
+            yield node, parent, depth, move if depth else -1, node_score
+            if max_depth is not None and depth >= max_depth:
+                continue
+            children = list(self.child_positions(x, o, move, node_score))
+            if keep is not None and children:
+                computer_to_move = ((x | o).bit_count() - self.root_pieces) % 2 == 0
+                children.sort(key=lambda child: -child[3] if computer_to_move else child[3])
+                children = children[:keep]
+            stack.extend((node, depth + 1, child_x, child_o, child_move, child_score)
+                         for child_move, child_x, child_o, child_score in reversed(children))
+
+
+def best_move(board, computer_marker):
+    #returns ((row, col), game_tree) for a list of lists board, the first move in cell order with the best score
+    #the tree from the computer's last move is kept, so when board follows on from it the search is a lookup
+    global last_tree
+    if last_tree is None or last_tree.player != computer_marker or not last_tree.advance(board):
+        last_tree = GameTree(board, computer_marker)
+    game_tree = last_tree
+    best_val = -float('inf')
+    for child in game_tree.children(game_tree.root):
+        if game_tree.score[child] > best_val:
+            best_move = child
+            best_val = game_tree.score[child]
+    return game_tree.cell(best_move), game_tree
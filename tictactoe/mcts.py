@@ -0,0 +1,248 @@
+#Monte Carlo tree search (UCT) engine, an alternative to the alphabeta Engine with the same best_move call
+#nodes live in flat arrays indexed by node number, a node's children are stored next to each other so a node
+#only needs the index of its first child and how many there are. The tree is kept between moves: the next
+#search starts from the node for the position actually reached, so everything already learned about it is reused
+import math
+import random
+import time
+from array import array
+
+from .bitboard import cell_lines, line_masks
+
+EXPLORATION = 0.5 #UCT exploration constant, results are scored 1 win, 0.5 draw, 0 loss, tuned on 5x5 at 100ms a move
+MAX_NODES = 2000000 #the tree stops growing here, and is compacted down to the reused subtree at the next move
+#a node's state after its move: game goes on, the move won (or forces a win), the move filled the board,
+#or the move loses because the other player has a winning reply. Proven wins and losses are passed up the tree
+OPEN, WON, DRAWN, LOST = 0, 1, 2, 3
+
+
+class MCTS:
+    def __init__(self, width, height=None, k=None, exploration=EXPLORATION, rollout_batch=None, max_nodes=MAX_NODES, seed=None):
+        self.width = width
+        self.height = height or width
+        self.k = k or min(self.width, self.height)
+        self.cells = self.width * self.height
+        self.lines = cell_lines(self.width, self.height, self.k)
+        self.all_lines = line_masks(self.width, self.height, self.k)
+        self.exploration = exploration
+        self.rollout_batch = rollout_batch #playouts per leaf with numpy's batch.playout_results, None plays one in Python
+        self.max_nodes = max_nodes
+        self.rng = random.Random(seed)
+        self.np_rng = None
+        self.clear()
+
+    def clear(self):
+        self.move = array('h') #cell played to reach the node, 'h' as a 15x15 board has cells past 127
+        self.state = array('b') #OPEN, WON, DRAWN or LOST
+        self.first_child = array('i') #-1 until the node is expanded
+        self.child_count = array('H')
+        self.visits = array('i')
+        self.score = array('d') #results summed for the player who made the node's move
+        self.root = None #node of the position the last search was for, with its x, o and marker to move
+        self.root_x = self.root_o = 0
+        self.root_mark = None
+
+    def add_node(self, move, state=OPEN):
+        self.move.append(move)
+        self.state.append(state)
+        self.first_child.append(-1)
+        self.child_count.append(0)
+        self.visits.append(0)
+        self.score.append(0.0)
+        return len(self.move) - 1
+
+    def find(self, x, o, mark):
+        #the node for this position in the tree kept from the last search, or None
+        if self.root is None or x & self.root_x != self.root_x or o & self.root_o != self.root_o:
+            return None
+        node, node_x, node_o, mover = self.root, self.root_x, self.root_o, self.root_mark
+        while (node_x, node_o) != (x, o):
+            added = x & ~node_x if mover == 'X' else o & ~node_o
+            first = self.first_child[node]
+            for child in range(first, first + self.child_count[node]):
+                if added >> self.move[child] & 1:
+                    break
+            else:
+                return None
+            node = child
+            if mover == 'X':
+                node_x |= 1 << self.move[child]
+            else:
+                node_o |= 1 << self.move[child]
+            mover = 'O' if mover == 'X' else 'X'
+        return node if mover == mark else None
+
+    def compact(self, root):
+        #copies the subtree under root into fresh arrays, children stay next to each other, root becomes node 0
+        old = (self.move, self.state, self.first_child, self.child_count, self.visits, self.score)
+        root_x, root_o, root_mark = self.root_x, self.root_o, self.root_mark
+        self.clear()
+        self.root_x, self.root_o, self.root_mark = root_x, root_o, root_mark
+        move, state, first_child, child_count, visits, score = old
+        queue = [root]
+        self.add_node(move[root], state[root])
+        for new, node in enumerate(queue):
+            self.visits[new] = visits[node]
+            self.score[new] = score[node]
+            if child_count[node]:
+                self.first_child[new] = len(self.move)
+                self.child_count[new] = child_count[node]
+                for child in range(first_child[node], first_child[node] + child_count[node]):
+                    self.add_node(move[child], state[child])
+                    queue.append(child)
+        return 0
+
+    def best_move(self, board, mark, time_budget=None, playout_budget=None):
+        #searches until the time (seconds) or playout budget runs out, returns (cell, playouts)
+        #the most visited move is played, at least one playout is always made
+        root = self.find(board.x, board.o, mark)
+        if root is None:
+            self.clear()
+            root = self.add_node(-1)
+        elif len(self.move) > self.max_nodes // 2:
+            self.root_x, self.root_o, self.root_mark = board.x, board.o, mark
+            root = self.compact(root)
+        self.root, self.root_x, self.root_o, self.root_mark = root, board.x, board.o, mark
+
+        deadline = time.perf_counter() + time_budget if time_budget is not None else None
+        playouts = 0
+        while True:
+            playouts += self.iterate()
+            if self.state[root] != OPEN: #the root is solved, more playouts cannot change the move
+                break
+            if playout_budget is not None and playouts >= playout_budget:
+                break
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            if playout_budget is None and deadline is None:
+                break
+
+        #a proven win if there is one, otherwise the most visited move that is not a proven loss
+        first = self.first_child[root]
+        children = range(first, first + self.child_count[root])
+        best = max(children, key=lambda child: (self.state[child] == WON, self.state[child] != LOST, self.visits[child]))
+        return self.move[best], playouts
+
+    def iterate(self):
+        #one selection, expansion, rollout and backup from the root, returns the playouts made
+        move, state, first_child, child_count, visits, score = (
+            self.move, self.state, self.first_child, self.child_count, self.visits, self.score)
+        node = self.root
+        path = [node]
+        bits = [self.root_x, self.root_o] #X's and O's pieces
+        turn = 0 if self.root_mark == 'X' else 1 #index into bits of the marker to move
+
+        #selection: follow the best UCT child down to a node that has not been expanded or ends the game
+        while state[node] == OPEN and first_child[node] >= 0:
+            first = first_child[node]
+            log_visits = math.log(visits[node])
+            best_value = -1.0
+            for child in range(first, first + child_count[node]):
+                child_visits = visits[child]
+                if child_visits == 0 or state[child] == WON:
+                    node = child
+                    break
+                if state[child] == LOST:
+                    value = 0.0 #only played when every move loses
+                else:
+                    value = score[child] / child_visits + self.exploration * math.sqrt(log_visits / child_visits)
+                if value > best_value:
+                    best_value = value
+                    node = child
+            bits[turn] |= 1 << move[node]
+            turn ^= 1
+            path.append(node)
+
+        #expansion: one child per empty cell, in random order so unvisited children are tried at random
+        #a winning child proves the node's own move lost, and the search goes straight to the win
+        if state[node] == OPEN and len(move) < self.max_nodes:
+            empty = [cell for cell in range(self.cells) if not (bits[0] | bits[1]) >> cell & 1]
+            self.rng.shuffle(empty)
+            first = first_child[node] = len(move)
+            child_count[node] = len(empty)
+            taken = (bits[0] | bits[1]).bit_count() + 1
+            winner = None
+            for cell in empty:
+                placed = bits[turn] | 1 << cell
+                if any(line & placed == line for line in self.lines[cell]):
+                    winner = self.add_node(cell, WON)
+                else:
+                    self.add_node(cell, DRAWN if taken == self.cells else OPEN)
+            if winner is not None:
+                self.prove(path, len(path) - 1)
+            node = first if winner is None else winner
+            bits[turn] |= 1 << move[node]
+            turn ^= 1
+            path.append(node)
+
+        #rollout: the result for the player who made the last move on the path
+        if state[node] == WON:
+            playouts, result = 1, 1.0
+        elif state[node] == LOST:
+            playouts, result = 1, 0.0
+        elif state[node] == DRAWN:
+            playouts, result = 1, 0.5
+        elif self.rollout_batch:
+            playouts = self.rollout_batch
+            result = playouts - self.batch_rollout(bits[0], bits[1], 'XO'[turn], playouts)
+        else:
+            playouts, result = 1, 1.0 - self.rollout(bits[turn], bits[turn ^ 1])
+
+        #backup: each node scores the result for the player who moved into it, which alternates going up
+        for node in reversed(path):
+            visits[node] += playouts
+            score[node] += result
+            result = playouts - result
+        return playouts
+
+    def prove(self, path, i):
+        #path[i] has a winning reply, so the move into it loses. If that leaves every move from its parent
+        #losing, the move into the parent wins, which makes the move before that lose, and so on up the path
+        state, first_child, child_count = self.state, self.first_child, self.child_count
+        while i > 0:
+            state[path[i]] = LOST
+            parent = path[i - 1]
+            first = first_child[parent]
+            if any(state[child] != LOST for child in range(first, first + child_count[parent])):
+                return
+            state[parent] = WON
+            if i < 2:
+                return
+            i -= 2
+        if i == 0:
+            state[path[0]] = LOST
+
+    def rollout(self, mine, theirs):
+        #one game, mine are the pieces of the player to move, returns 1, 0.5 or 0 for that player
+        #moves are random except that a player with a win takes it and otherwise blocks the other's win,
+        #which costs a scan of the lines per move but gives far better results per playout than pure random
+        empty = [cell for cell in range(self.cells) if not (mine | theirs) >> cell & 1]
+        self.rng.shuffle(empty)
+        all_lines = self.all_lines
+        need = self.k - 1
+        result = 1.0
+        while empty:
+            move = None
+            for line in all_lines:
+                if not line & theirs and (line & mine).bit_count() == need:
+                    return result
+            for line in all_lines:
+                if not line & mine and (line & theirs).bit_count() == need:
+                    move = (line & ~theirs).bit_length() - 1
+                    empty.remove(move)
+                    break
+            if move is None:
+                move = empty.pop()
+            mine |= 1 << move
+            mine, theirs = theirs, mine
+            result = 1.0 - result
+        return 0.5
+
+    def batch_rollout(self, x, o, mark, playouts):
+        #numpy playouts, returns the summed results for mark
+        from .batch import playout_results
+        if self.np_rng is None:
+            import numpy as np
+            self.np_rng = np.random.default_rng(self.rng.getrandbits(64))
+        wins, draws, _ = playout_results(playouts, mark, self.width, self.height, self.k, x, o, self.np_rng)
+        return wins + 0.5 * draws
@@ -0,0 +1,97 @@
+#Scenario3's full depth minimax for the 3x3 game, memoized on symmetry-canonical positions
+#and backed by the precomputed table in solved3x3.bin
+from .bitboard import Bitboard
+from .engine import score #board is a Bitboard here
+from .symmetry import canonical, from_canonical, to_canonical
+from . import solved_table
+
+#results of every position searched so far, shared by all moves and games in this process
+#key is (x, o, marker to move) of the canonical position, value is (score for the mover, best move in canonical cells)
+memo = {}
+
+#precomputed answers for every reachable position, None if solved3x3.bin has not been built
+solved = solved_table.load()
+
+
+def minimax(board, depth, is_maximizing, player, opponent, last_move=None):
+    #evaluate the current board state
+    #node and memo counts come from stats.SearchStats, which wraps this function while it is attached
+    board_score = score(board, player, opponent, last_move)
+    
+    
+    #check if the game is won or lost and return the score
+    if board_score == 10 or board_score == -10:
+        return board_score
+    
+    #return 0 if draw
+    if board.is_full():
+        return 0
+
+    #rotations and reflections of a position have the same score, so they share one memo entry
+    mover = player if is_maximizing else opponent
+    canon_x, canon_o, symmetry = canonical(board.x, board.o, board.width)
+    key = (canon_x, canon_o, mover)
+    if key in memo:
+        mover_score = memo[key][0]
+        return mover_score if is_maximizing else -mover_score
+    best_move = None
+
+    # if maximizing is true ( computer's turn )
+    if is_maximizing:
+        # initialise best to negative infinity to ensure any valid move will be higher
+        best = -float('inf')
+        
+        #iterate over all empty positions
+        for move in board.empty_cells():
+            #simluates move by placing computer's marker
+            board.place(move, player)
+            
+            # recursively calls minimax for the next move with the minimizing
+            value = minimax(board, depth + 1, False, player, opponent, move)
+            
+            #resets position
+            board.undo(move, player)
+
+            if value > best:
+                best = value
+                best_move = move
+        
+        memo[key] = (best, to_canonical(best_move, board.width, symmetry))
+        # returns best score
+        return best
+    else:
+        # for the human player's turn (minimizer), initialise best to positive infinity
+        best = float('inf')
+        
+        for move in board.empty_cells():
+            board.place(move, opponent)
+            
+            # recursively calls minimax for the next move with the minimizing - taking the minimum move (where the opponent does not win)
+            value = minimax(board, depth + 1, True, player, opponent, move)
+       
+            board.undo(move, opponent)
+
+            if value < best:
+                best = value
+                best_move = move
+        
+        memo[key] = (-best, to_canonical(best_move, board.width, symmetry))
+        return best
+
+
+def best_move(board, computer_marker):
+    #returns the (row, col) to play on a 3x3 list of lists board
+    #answer straight from the solved table when it is available
+    if solved is not None:
+        entry = solved_table.probe(solved, board, computer_marker)
+        if entry is not None:
+            return entry[1]
+
+    opponent_marker = 'X' if computer_marker == 'O' else 'O'
+    bitboard = Bitboard.from_board(board)
+
+    #search the position (instant once it is in the memo), then map its best move back to this board
+    minimax(bitboard, 0, True, computer_marker, opponent_marker)
+    canon_x, canon_o, symmetry = canonical(bitboard.x, bitboard.o, bitboard.width)
+    move = from_canonical(memo[(canon_x, canon_o, computer_marker)][1], bitboard.width, symmetry)
+    return divmod(move, bitboard.width)
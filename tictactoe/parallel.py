@@ -0,0 +1,81 @@
+#parallel root search for the Engine: root moves are shared out across a process pool
+#young brothers wait: the first (best ordered) move is searched on its own to get a bound,
+#then its younger brothers are searched in parallel. Each task reads the best root score so far from a shared bound
+#when it starts and raises it when it finishes, a search already running keeps the window it started with: narrowing
+#it part way would leave nodes above with a wider window than the ones below, and their table entries would be wrong
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from .engine import Budget, Engine, SearchTimeout
+
+NO_BOUND = -10 ** 9 #value of the shared bound before any root move has finished
+
+#worker process state
+shared_bound = None #best root score found so far in this search, shared by every worker
+worker_engines = {} #(width, height, k) -> Engine, reused by the tasks of one search
+worker_search = None #the search the worker's engines belong to, they start fresh when it changes
+
+
+def init_worker(bound):
+    global shared_bound
+    shared_bound = bound
+
+
+def search_root_move(width, height, k, tt_size_mb, x, o, mark, move, max_depth, search, deadline, node_budget):
+    #runs in a worker, scores one root move
+    global worker_search
+    if search != worker_search:
+        worker_engines.clear()
+        worker_search = search
+    if (width, height, k) not in worker_engines:
+        worker_engines[(width, height, k)] = Engine(width, height, k, tt_size_mb)
+    engine = worker_engines[(width, height, k)]
+    opponent = 'X' if mark == 'O' else 'O'
+
+    #searching with a window one below the shared bound (scores are whole numbers) means a move that
+    #ties the best so far still gets its exact score, so the earliest best move wins as in the serial search.
+    #The bound is only read here, once, see the top of the file
+    with shared_bound.get_lock():
+        bound = shared_bound.value
+    alpha = -float('inf') if bound == NO_BOUND else bound - 1
+
+    board = engine.new_board(x, o)
+    board.place(move, mark)
+    value = engine.minimax(board, 0, False, mark, opponent, alpha, float('inf'), max_depth, Budget(nodes=node_budget, deadline=deadline), move)
+
+    with shared_bound.get_lock():
+        if value > shared_bound.value:
+            shared_bound.value = value
+    return value
+
+
+class ParallelSearch:
+    def __init__(self, workers):
+        self.workers = workers
+        self.bound = multiprocessing.Value('i', NO_BOUND)
+        self.executor = ProcessPoolExecutor(workers, initializer=init_worker, initargs=(self.bound,))
+
+    def search_root(self, engine, board, mark, max_depth, root_moves, deadline=None, node_budget=None):
+        #same result as engine.search_root, raises SearchTimeout if the deadline passes first
+        with self.bound.get_lock():
+            self.bound.value = NO_BOUND
+
+        def submit(move):
+            return self.executor.submit(search_root_move, engine.width, engine.height, engine.k, engine.tt_size_mb,
+                                        board.x, board.o, mark, move, max_depth, engine.searches, deadline, node_budget)
+
+        scores = {}
+        futures = {}
+        try:
+            scores[root_moves[0]] = submit(root_moves[0]).result()
+            futures = {move: submit(move) for move in root_moves[1:]}
+            for move, future in futures.items():
+                scores[move] = future.result()
+        except SearchTimeout:
+            for future in futures.values():
+                future.cancel()
+            raise
+        return scores
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
@@ -0,0 +1,68 @@
+#pondering: searching on the human's time
+#while the human thinks, a background thread takes the replies the engine expects them to play, best first,
+#and searches the computer's answer to each one. When the human moves, the thread is stopped and the answer to
+#that reply is used straight away if it was searched with at least the normal move time. Otherwise the computer
+#searches as usual, still helped by the positions the pondering left in the engine's transposition table
+import threading
+import time
+
+PONDER_REPLIES = 5 #how many of the human's likely replies are searched
+
+
+class Ponderer:
+    def __init__(self, engine, replies=PONDER_REPLIES):
+        self.engine = engine
+        self.replies = replies
+        self.results = {} #human's reply -> (computer's answer, depth reached, seconds searched)
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def start(self, board, human, computer, time_budget):
+        #starts pondering the position on board (a LineCountBoard, human to move), returns at once
+        self.stop()
+        self.results = {}
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, args=(board.copy(), human, computer, time_budget), daemon=True)
+        self.thread.start()
+
+    def stop(self, reply=None, time_budget=None):
+        #stops pondering and waits for the thread, which takes at most 1024 nodes of searching
+        #returns (cell, depth) for the computer's answer to reply if it was searched for time_budget or more, else None
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        result = self.results.get(reply)
+        if result is None or (time_budget is not None and result[2] < time_budget):
+            return None
+        return result[0], result[1]
+
+    def likely_replies(self, board, human):
+        #the human's moves, best first by a one ply search from their side
+        moves = list(board.empty_cells())
+        scores = self.engine.search_root(board.copy(), human, 1, moves)
+        return sorted(moves, key=lambda move: -scores[move])[:self.replies]
+
+    def run(self, board, human, computer, time_budget):
+        #every likely reply is searched for time_budget, then again for twice as long, and so on until stopped
+        replies = self.likely_replies(board, human)
+        seconds = time_budget
+        searched_out = set() #replies whose search finished inside its time, more time cannot change them
+        while len(searched_out) < len(replies):
+            for reply in replies:
+                if self.stop_event.is_set():
+                    return
+                if reply in searched_out:
+                    continue
+                board.place(reply, human)
+                if board.wins_at(reply, human) or board.is_full():
+                    searched_out.add(reply) #the game is over, there is nothing to answer
+                else:
+                    start = time.perf_counter()
+                    cell, depth = self.engine.best_move(board, computer, seconds, stop=self.stop_event)
+                    if not self.stop_event.is_set(): #a search cut short by stop is not worth keeping
+                        self.results[reply] = (cell, depth, seconds)
+                        if time.perf_counter() - start < seconds: #it reached the end of the game or a forced win
+                            searched_out.add(reply)
+                board.undo(reply, human)
+            seconds *= 2
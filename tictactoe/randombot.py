@@ -0,0 +1,9 @@
+#Scenario1's computer: plays any empty cell at random
+import random
+
+from .board import get_empty_positions
+
+
+def random_move(board, rng=random):
+    #returns the (row, col) to play, rng can be a seeded random.Random
+    return rng.choice(get_empty_positions(board))
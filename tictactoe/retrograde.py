@@ -0,0 +1,216 @@
+#exact results for every position of a small board (4x4 and below) by retrograde analysis, stored 2 bits a position
+#positions are solved a layer at a time from the full board back to the empty one, each layer from the one after
+#it, so every position is looked at once and no search is ever repeated. The table is indexed by the base 3 position
+#index (cell i counts 1 * 3^i for X and 2 * 3^i for O) and holds solved_table's result codes for the marker to move,
+#four positions to a byte: 3^16 positions take 10.8 MB for 4x4. It is written to disk and memory mapped, not committed
+#build it with: python -m tictactoe.retrograde [width] [height] [k] [processes]      (needs numpy, only for building)
+#
+#the table is for games X started, so X is to move when the counts are equal. A game O started is the same
+#game with the markers swapped, which is how it is looked up
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .bitboard import cell_lines, line_masks
+from .solved_table import DRAW, LOSS, UNSOLVED, WIN
+
+MAGIC = b"TTTR"
+CHUNK = 1 << 20 #positions a worker solves at a time
+MAX_CELLS = 16 #3^16 positions is the most worth tabulating, 5x5 would need 3^25
+
+tables = {} #(width, height, k) -> Table, or None when there is no file
+MASKS = {} #cells -> (every mask of that many bits, how many bits each has set), for building
+
+
+def table_path(width, height, k):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), f"retro{width}x{height}k{k}.bin")
+
+
+class Table:
+    def __init__(self, data, width, height, k):
+        self.data = data
+        self.width = width
+        self.height = height
+        self.k = k
+        self.cells = width * height
+        self.lines = line_masks(width, height, k)
+        self.cell_lines = cell_lines(width, height, k)
+        self.weights = [3 ** cell for cell in range(self.cells)]
+
+    def index(self, x, o, mark):
+        #(base 3 index, marker to move) in the table's game, with the markers swapped if O started,
+        #None for piece counts no game can reach
+        x_count, o_count = x.bit_count(), o.bit_count()
+        if x_count < o_count or (x_count == o_count and mark == 'O'): #O started
+            x, o, x_count, o_count = o, x, o_count, x_count
+            mark = 'X' if mark == 'O' else 'O'
+        if x_count - o_count not in (0, 1) or mark != ('X' if x_count == o_count else 'O'):
+            return None
+        index = 0
+        weights = self.weights
+        while x:
+            low = x & -x
+            index += weights[low.bit_length() - 1]
+            x ^= low
+        while o:
+            low = o & -o
+            index += 2 * weights[low.bit_length() - 1]
+            o ^= low
+        return index, mark
+
+    def result_at(self, index):
+        return self.data[len(MAGIC) + 3 + (index >> 2)] >> (2 * (index & 3)) & 3
+
+    def result(self, x, o, mark):
+        #LOSS, DRAW or WIN for mark to move (LOSS when the other marker has already won), UNSOLVED for impossible positions
+        found = self.index(x, o, mark)
+        return UNSOLVED if found is None else self.result_at(found[0])
+
+    def best_move(self, x, o, mark):
+        #returns (result, cell) for mark to move, a winning move at once if there is one, otherwise the
+        #lowest cell with the best result, or None if the game is over or the position impossible
+        found = self.index(x, o, mark)
+        mine, theirs = (x, o) if mark == 'X' else (o, x)
+        taken = x | o
+        if found is None or self.result_at(found[0]) == UNSOLVED or any(line & theirs == line for line in self.lines):
+            return None
+        index, table_mark = found
+        step = 1 if table_mark == 'X' else 2 #what a piece of the marker to move adds to the index
+        best = None
+        for cell in range(self.cells):
+            if taken >> cell & 1:
+                continue
+            placed = mine | 1 << cell
+            if any(line & placed == line for line in self.cell_lines[cell]):
+                return WIN, cell
+            result = 4 - self.result_at(index + step * self.weights[cell]) #the other marker's loss is our win
+            if best is None or result > best[0]:
+                best = (result, cell)
+        return best
+
+
+def load(width, height=None, k=None):
+    #the memory mapped table for this board, None if it has not been built
+    height = height or width
+    k = k or min(width, height)
+    if (width, height, k) not in tables:
+        tables[(width, height, k)] = None
+        try:
+            with open(table_path(width, height, k), "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if data[:len(MAGIC)] != MAGIC or tuple(data[len(MAGIC):len(MAGIC) + 3]) != (width, height, k) \
+                or len(data) != len(MAGIC) + 3 + (3 ** (width * height) + 3) // 4:
+            data.close()
+            return None
+        tables[(width, height, k)] = Table(data, width, height, k)
+    return tables[(width, height, k)]
+
+
+def masks_with(cells, count):
+    #every mask of cells bits with count of them set, in increasing order
+    import numpy as np
+    if cells not in MASKS:
+        masks = np.arange(1 << cells, dtype=np.uint32)
+        bits = np.zeros(1 << cells, dtype=np.uint8)
+        for cell in range(cells):
+            bits += (masks >> cell & 1).astype(np.uint8)
+        MASKS[cells] = (masks, bits)
+    masks, bits = MASKS[cells]
+    return masks[bits == count]
+
+
+def solve_chunk(path, width, height, k, x_masks, o_count):
+    #runs in a worker: solves the positions with these X masks and o_count O pieces, each position reading its
+    #children from the layer after it in the shared file of one byte per position, and writing its own result
+    import numpy as np
+    cells = width * height
+    table = np.memmap(path, dtype=np.uint8, mode="r+")
+    o_masks = masks_with(cells, o_count)
+    x = np.repeat(x_masks, len(o_masks))
+    o = np.tile(o_masks, len(x_masks))
+    legal = (x & o) == 0
+    x, o = x[legal], o[legal]
+    index = np.zeros(len(x), dtype=np.int64)
+    for cell in range(cells):
+        index += (x >> cell & 1).astype(np.int64) * 3 ** cell + (o >> cell & 1).astype(np.int64) * (2 * 3 ** cell)
+
+    x_to_move = int(x_masks[0]).bit_count() == o_count
+    mover, other = (x, o) if x_to_move else (o, x)
+    mover_won = np.zeros(len(x), dtype=bool)
+    other_won = np.zeros(len(x), dtype=bool)
+    for line in line_masks(width, height, k):
+        mover_won |= (mover & line) == line
+        other_won |= (other & line) == line
+
+    result = np.full(len(x), UNSOLVED, dtype=np.uint8) #a position where the mover has already won cannot happen
+    result[other_won & ~mover_won] = LOSS
+    open_ = ~other_won & ~mover_won
+    if int(x_masks[0]).bit_count() + o_count == cells:
+        result[open_] = DRAW
+    else:
+        best = np.zeros(len(x), dtype=np.uint8)
+        taken = x | o
+        step = 1 if x_to_move else 2
+        for cell in range(cells):
+            moves = open_ & ((taken >> cell & 1) == 0)
+            child = table[index[moves] + step * 3 ** cell]
+            best[moves] = np.maximum(best[moves], 4 - child) #the other marker's loss is our win
+        result[open_] = best[open_]
+    table[index] = result
+    table.flush()
+    return int((result != UNSOLVED).sum())
+
+
+def build(width=4, height=None, k=None, processes=None, path=None):
+    #solves every position of the board into the table file, returns the number of positions solved
+    import numpy as np
+    height = height or width
+    k = k or min(width, height)
+    cells = width * height
+    if cells > MAX_CELLS:
+        raise ValueError(f"{width}x{height} has too many positions to tabulate, the limit is {MAX_CELLS} cells")
+    path = path or table_path(width, height, k)
+    work = path + ".tmp"
+    np.zeros(3 ** cells, dtype=np.uint8).tofile(work)
+
+    pool = ProcessPoolExecutor(processes) if processes and processes > 1 else None
+    solved = 0
+    try:
+        for pieces in range(cells, -1, -1):
+            x_count, o_count = (pieces + 1) // 2, pieces // 2
+            x_masks = masks_with(cells, x_count)
+            o_total = len(masks_with(cells, o_count))
+            per_chunk = max(1, CHUNK // o_total)
+            chunks = [x_masks[start:start + per_chunk] for start in range(0, len(x_masks), per_chunk)]
+            args = [(work, width, height, k, chunk, o_count) for chunk in chunks]
+            if pool is not None:
+                solved += sum(pool.map(solve_chunk, *zip(*args)))
+            else:
+                solved += sum(solve_chunk(*arg) for arg in args)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    #four positions to a byte, the first in the lowest two bits
+    table = np.fromfile(work, dtype=np.uint8)
+    table = np.concatenate([table, np.zeros(-len(table) % 4, dtype=np.uint8)]).reshape(-1, 4)
+    packed = table[:, 0] | table[:, 1] << 2 | table[:, 2] << 4 | table[:, 3] << 6
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(bytes([width, height, k]))
+        f.write(packed.astype(np.uint8).tobytes())
+    os.remove(work)
+    tables.pop((width, height, k), None)
+    return solved
+
+
+if __name__ == "__main__":
+    import sys
+    args = [int(arg) for arg in sys.argv[1:]]
+    width = args[0] if args else 4
+    height = args[1] if len(args) > 1 else width
+    k = args[2] if len(args) > 2 else min(width, height)
+    processes = args[3] if len(args) > 3 else os.cpu_count()
+    print(f"Solved {build(width, height, k, processes)} positions into {table_path(width, height, k)}")
@@ -0,0 +1,67 @@
+#Scenario2's computer: win if it can, block if it must, make a fork or stop one, take the centre, otherwise play at random
+#the rules read a ThreatBoard, whose index of open lines answers each of them without trying moves on the board
+import random
+
+from .bitboard import ThreatBoard
+
+
+def can_win(board, mark, k=None):
+    #returns a (row, col) where mark would complete a line, or None
+    cells = ThreatBoard.from_board(board, k).winning_cells(mark)
+    if cells:
+        return divmod(cells[0], len(board[0]))
+    return None
+
+
+def rule_move(board, computer_marker, rng=random, k=None):
+    #returns the (row, col) to play on a list of lists board, k in a row wins (the shorter side by default)
+    bitboard = ThreatBoard.from_board(board, k)
+    return divmod(rule_cell(bitboard, computer_marker, rng), bitboard.width)
+
+
+def rule_cell(board, computer_marker, rng=random):
+    #returns the cell to play on a ThreatBoard, where a rule allows several cells the lowest is played
+    opponent_marker = 'X' if computer_marker == 'O' else 'O'
+
+    # Step 1: Check if there is a move to win the game
+    cells = board.winning_cells(computer_marker)
+    if cells:
+        return cells[0]
+
+    # Step 2: Check for a move to block the opponent's game
+    cells = board.winning_cells(opponent_marker)
+    if cells:
+        return cells[0]
+
+    # Step 3: Make two threats at once, only one of them can be blocked
+    cells = board.fork_cells(computer_marker)
+    if cells:
+        return cells[0]
+
+    # Step 4: Stop the opponent's fork
+    cells = board.fork_cells(opponent_marker)
+    if cells:
+        return block_fork(board, computer_marker, cells)
+
+    # Step 5: Claim the center if unoccupied
+    center = board.width * (board.height // 2) + board.width // 2
+    if not (board.x | board.o) >> center & 1:
+        return center
+
+    # Step 6: Place the marker on any empty cell
+    return rng.choice(list(board.empty_cells()))
+
+
+def block_fork(board, mark, forks):
+    #one fork is blocked by taking its cell. With more than one, a threat of our own forces the reply instead,
+    #as long as the cell it forces is not one of the forks
+    if len(forks) == 1:
+        return forks[0]
+    taken = board.x | board.o
+    for cell in board.empty_cells():
+        for i in board.cell_line_ids[cell]:
+            if i in board.twos[mark]:
+                reply = (board.lines[i] & ~taken & ~(1 << cell)).bit_length() - 1
+                if reply not in forks:
+                    return cell
+    return forks[0]
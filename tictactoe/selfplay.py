@@ -0,0 +1,133 @@
+#headless self-play between the bots, for measuring their strength and speed
+#games are played on bit masks, the random and rules bots here pick exactly the moves randombot.py and rules.py
+#would for the same rng, just without building a list of lists board every move
+#
+#game g of a match gives the first named bot 'X' when g is even, and the first move when g // 2 is even,
+#so every four games cover each marker and each seat. Games are played in blocks with their own seeded rng,
+#and the alphabeta and mcts bots start every game with a fresh engine (mcts seeded from that rng), so a match
+#gives the same results however many processes it is split across and however often it is played
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from .bitboard import LineCountBoard, ThreatBoard, cell_lines
+from .rules import rule_cell
+
+BLOCK = 2000 #games per block, the unit of work handed to each process
+ALPHABETA_NODES = 2000 #alphabeta's node budget per move, a time budget would make its games depend on the machine
+MCTS_PLAYOUTS = 1000 #mcts's playout budget per move, for the same reason
+
+minimax_moves = {} #(x, o, marker) -> cell, the minimax bot's answers so far in this process
+threat_board = None #the rules bot's ThreatBoard for the position it last played in
+searchers = {} #bot name -> its Engine or MCTS for the game being played, emptied at the start of every game
+
+
+def random_bot(shape, x, o, mark, rng):
+    taken = x | o
+    return rng.choice([cell for cell in range(shape[0] * shape[1]) if not taken >> cell & 1])
+
+
+def rules_bot(shape, x, o, mark, rng):
+    #the board from the last call is moved on to this position when it follows on from it, so the threat
+    #index is kept up to date a move at a time instead of being built again from every line
+    global threat_board
+    board = threat_board
+    if board is None or (board.width, board.height, board.k) != shape or x & board.x != board.x or o & board.o != board.o:
+        board = threat_board = ThreatBoard(*shape, x, o)
+    else:
+        for bits, placed in ((x & ~board.x, 'X'), (o & ~board.o, 'O')):
+            while bits:
+                low = bits & -bits
+                board.place(low.bit_length() - 1, placed)
+                bits ^= low
+    return rule_cell(board, mark, rng)
+
+
+def minimax_bot(shape, x, o, mark, rng):
+    #3x3 only, the solved table answers the first time each position is seen and the dict after that
+    key = (x, o, mark)
+    if key not in minimax_moves:
+        from . import minimax3
+        rows = [''.join('X' if x >> (3 * row + col) & 1 else 'O' if o >> (3 * row + col) & 1 else '.' for col in range(3))
+                for row in range(3)]
+        row, col = minimax3.best_move(rows, mark)
+        minimax_moves[key] = 3 * row + col
+    return minimax_moves[key]
+
+
+def alphabeta_bot(shape, x, o, mark, rng):
+    #its table and history carry over between the moves of a game but not into the next game
+    if "alphabeta" not in searchers:
+        from .engine import Engine
+        searchers["alphabeta"] = Engine(*shape)
+    cell, _ = searchers["alphabeta"].best_move(LineCountBoard(*shape, x, o), mark, node_budget=ALPHABETA_NODES)
+    return cell
+
+
+def mcts_bot(shape, x, o, mark, rng):
+    #its tree carries over between the moves of a game, and its playouts are seeded from the block's rng
+    if "mcts" not in searchers:
+        from .mcts import MCTS
+        searchers["mcts"] = MCTS(*shape, seed=rng.getrandbits(64))
+    cell, _ = searchers["mcts"].best_move(LineCountBoard(*shape, x, o), mark, playout_budget=MCTS_PLAYOUTS)
+    return cell
+
+
+BOTS = {"random": random_bot, "rules": rules_bot, "minimax": minimax_bot, "alphabeta": alphabeta_bot, "mcts": mcts_bot}
+
+
+def play_game(shape, bots, marks, rng):
+    #bots and marks are (first mover's, second mover's), returns (0 or 1 for the winner, None for a draw, moves played)
+    lines = cell_lines(*shape)
+    cells = shape[0] * shape[1]
+    searchers.clear()
+    x = o = 0
+    for move in range(cells):
+        turn = move & 1
+        mark = marks[turn]
+        cell = bots[turn](shape, x, o, mark, rng)
+        if mark == 'X':
+            x |= 1 << cell
+            bits = x
+        else:
+            o |= 1 << cell
+            bits = o
+        if any(line & bits == line for line in lines[cell]):
+            return turn, move + 1
+    return None, cells
+
+
+def play_block(shape, names, seed, block, games):
+    #plays games block * BLOCK onwards, returns [wins, draws, losses, moves] for the first named bot
+    bot_a, bot_b = BOTS[names[0]], BOTS[names[1]]
+    rng = random.Random(seed * 1000003 + block)
+    tally = [0, 0, 0, 0]
+    for g in range(block * BLOCK, block * BLOCK + games):
+        mark_a = 'X' if g & 1 == 0 else 'O'
+        mark_b = 'O' if mark_a == 'X' else 'X'
+        a_first = (g >> 1) & 1 == 0
+        if a_first:
+            winner, moves = play_game(shape, (bot_a, bot_b), (mark_a, mark_b), rng)
+        else:
+            winner, moves = play_game(shape, (bot_b, bot_a), (mark_b, mark_a), rng)
+            winner = None if winner is None else 1 - winner
+        tally[1 if winner is None else 0 if winner == 0 else 2] += 1
+        tally[3] += moves
+    return tally
+
+
+def play_match(a, b, games, seed=0, shape=(3, 3, 3), processes=None):
+    #plays games between bots a and b, split over a process pool when processes is more than 1
+    #returns {"wins", "draws", "losses"} from a's side plus the total "moves"
+    for name in (a, b):
+        if name not in BOTS:
+            raise ValueError(f"unknown bot {name!r}, expected one of {', '.join(BOTS)}")
+        if name == "minimax" and shape != (3, 3, 3):
+            raise ValueError("the minimax bot only plays 3x3")
+    blocks = [(shape, (a, b), seed, block, min(BLOCK, games - block * BLOCK)) for block in range(-(-games // BLOCK))]
+    if processes and processes > 1:
+        with ProcessPoolExecutor(processes) as pool:
+            tallies = list(pool.map(play_block, *zip(*blocks)))
+    else:
+        tallies = [play_block(*args) for args in blocks]
+    wins, draws, losses, moves = (sum(column) for column in zip(*tallies)) if tallies else (0, 0, 0, 0)
+    return {"wins": wins, "draws": draws, "losses": losses, "moves": moves}
@@ -0,0 +1,205 @@
+#asyncio server that hosts many games at once over a line based TCP protocol
+#each game is a few integers in memory, searches that take real time (alphabeta and mcts) run in a process pool
+#so the event loop keeps answering the other games while they think
+#
+#requests, one per line, the client picks each game's id so one connection can play many games at once:
+#    new <id> <engine> <width> <height> <k> <player's marker>   ->  <id> <cell> <state>
+#    move <id> <cell>                                            ->  <id> <cell> <state>
+#    quit <id>                                                   ->  <id> -1 quit
+#cells are numbered 0 to width * height - 1, the cell answered is where the computer played (-1 if it did not)
+#and state is play, win, loss or draw from the player's side. X always moves first, so a player who takes O
+#gets the computer's first move in the answer to new. Bad requests are answered with: <id> error <reason>,
+#and so is a move the computer failed to answer, which is taken back so it can be sent again
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+from . import ENGINES, best_move, get_engine
+from .bitboard import LineCountBoard, cell_lines
+
+MOVE_TIME = 0.1 #alphabeta's and mcts's budget per move in seconds, kept short since a server plays many games
+OFFLOADED = ("alphabeta", "mcts") #engines that run in the process pool, the rest answer in microseconds
+MAX_CELLS = 64 #largest board a game may ask for
+
+
+class Game: #one game's state, everything else is shared between games
+    __slots__ = ("shape", "engine", "computer", "x", "o", "busy")
+
+    def __init__(self, shape, engine, computer):
+        self.shape = shape #(width, height, k)
+        self.engine = engine
+        self.computer = computer
+        self.x = 0
+        self.o = 0
+        self.busy = False #True while the computer is thinking, moves sent meanwhile are refused
+
+    def place(self, cell, mark):
+        #places mark and returns True if it completed a line
+        if mark == 'X':
+            self.x |= 1 << cell
+            bits = self.x
+        else:
+            self.o |= 1 << cell
+            bits = self.o
+        return any(line & bits == line for line in cell_lines(*self.shape)[cell])
+
+    def undo(self, cell, mark):
+        if mark == 'X':
+            self.x &= ~(1 << cell)
+        else:
+            self.o &= ~(1 << cell)
+
+    def is_full(self):
+        width, height, _ = self.shape
+        return (self.x | self.o).bit_count() == width * height
+
+
+def computer_cell(width, height, k, x, o, mark, engine, budget):
+    #the cell the engine plays for mark, runs in the process pool for the offloaded engines
+    if engine == "alphabeta":
+        cell, _ = get_engine(width, height, k).best_move(LineCountBoard(width, height, k, x, o), mark, budget)
+        return cell
+    rows = [''.join('X' if x >> (width * row + col) & 1 else 'O' if o >> (width * row + col) & 1 else '.'
+                    for col in range(width)) for row in range(height)]
+    row, col = best_move(rows, mark, engine, budget, k)
+    return width * row + col
+
+
+class GameServer:
+    def __init__(self, workers=None, budget=MOVE_TIME):
+        self.workers = workers #process pool size, None for one per CPU
+        self.budget = budget
+        self.executor = None
+        self.server = None
+        self.games = 0 #games in progress on every connection
+        self.finished = 0
+        self.moves = 0 #moves played by the computer
+
+    async def start(self, host="127.0.0.1", port=0):
+        #starts listening and returns the port, port 0 picks a free one
+        self.executor = ProcessPoolExecutor(self.workers)
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.server.serve_forever()
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+        self.executor.shutdown(cancel_futures=True)
+
+    async def handle(self, reader, writer):
+        #one connection, which owns the games it starts, they are dropped when it closes
+        games = {}
+        thinking = set()
+        try:
+            while line := await reader.readline():
+                reply = self.request(games, line.split(), writer, thinking)
+                if reply is not None:
+                    writer.write(reply.encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for task in thinking:
+                task.cancel()
+            self.games -= len(games)
+            writer.close()
+
+    def request(self, games, fields, writer, thinking):
+        #answers a request straight away, or returns None once a search has been started that will answer it
+        game_id = fields[1].decode() if len(fields) > 1 else '-'
+        try:
+            op = fields[0].decode() if fields else None #a blank line is an unknown request too
+            if op == "new" and len(fields) == 7:
+                game = self.new_game(games, game_id, fields[2].decode(), *(int(f) for f in fields[3:6]), fields[6].decode())
+                if game.computer == 'O':
+                    return f"{game_id} -1 play\n"
+            elif op == "move" and len(fields) == 3:
+                game = games.get(game_id)
+                if game is None:
+                    raise ValueError("no such game")
+                if game.busy:
+                    raise ValueError("the computer is still thinking")
+                cell = int(fields[2])
+                width, height, _ = game.shape
+                if not 0 <= cell < width * height:
+                    raise ValueError("no such cell")
+                if (game.x | game.o) >> cell & 1:
+                    raise ValueError("that cell is not free")
+                player = 'O' if game.computer == 'X' else 'X'
+                if game.place(cell, player):
+                    return self.end(games, game_id, -1, "win")
+                if game.is_full():
+                    return self.end(games, game_id, -1, "draw")
+            elif op == "quit" and len(fields) == 2:
+                if game_id not in games:
+                    raise ValueError("no such game")
+                return self.end(games, game_id, -1, "quit")
+            else:
+                raise ValueError("unknown request")
+        except ValueError as error:
+            return f"{game_id} error {error}\n"
+
+        if game.engine in OFFLOADED:
+            game.busy = True
+            task = asyncio.create_task(self.offloaded_move(games, game_id, game, writer, cell if op == "move" else None))
+            thinking.add(task)
+            task.add_done_callback(thinking.discard)
+            return None
+        width, height, k = game.shape
+        return self.play(games, game_id, game, computer_cell(width, height, k, game.x, game.o, game.computer, game.engine, self.budget))
+
+    def new_game(self, games, game_id, engine, width, height, k, player):
+        if game_id in games:
+            raise ValueError("that game id is in use")
+        if engine not in ENGINES or player not in ['X', 'O']:
+            raise ValueError("unknown engine or marker")
+        if not (0 < width and 0 < height and width * height <= MAX_CELLS and 0 < k <= max(width, height)):
+            raise ValueError("bad board size")
+        if engine == "auto":
+            engine = "minimax" if width == height == k == 3 else "alphabeta"
+        if engine == "minimax" and not width == height == k == 3:
+            raise ValueError("the minimax engine only plays 3x3")
+        game = Game((width, height, k), engine, 'O' if player == 'X' else 'X')
+        games[game_id] = game
+        self.games += 1
+        return game
+
+    async def offloaded_move(self, games, game_id, game, writer, player_cell=None):
+        #a search that fails (the engine raised, or the pool broke) is answered with an error instead of a move
+        #and the player's move that started it, player_cell, is taken back. The game takes moves again either way
+        width, height, k = game.shape
+        cell = None
+        try:
+            cell = await asyncio.get_running_loop().run_in_executor(
+                self.executor, computer_cell, width, height, k, game.x, game.o, game.computer, game.engine, self.budget)
+        except Exception as error:
+            if player_cell is not None:
+                game.undo(player_cell, 'O' if game.computer == 'X' else 'X')
+            reply = f"{game_id} error {str(error) or type(error).__name__}\n"
+        finally:
+            game.busy = False
+        if games.get(game_id) is not game: #the game was quit while the computer was thinking
+            return
+        if cell is not None:
+            reply = self.play(games, game_id, game, cell)
+        try:
+            writer.write(reply.encode())
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    def play(self, games, game_id, game, cell):
+        self.moves += 1
+        if game.place(cell, game.computer):
+            return self.end(games, game_id, cell, "loss")
+        if game.is_full():
+            return self.end(games, game_id, cell, "draw")
+        return f"{game_id} {cell} play\n"
+
+    def end(self, games, game_id, cell, state):
+        del games[game_id]
+        self.games -= 1
+        self.finished += 1
+        return f"{game_id} {cell} {state}\n"
@@ -0,0 +1,87 @@
+#solved 3x3 positions stored in a small binary file, so the computer's move is a single lookup
+#build it with: python -m tictactoe.solved_table
+#file layout: MAGIC, then 2 bytes for every base 3 position index (X to move, then O to move)
+#each byte is (result << 4) | best cell, result is LOSS/DRAW/WIN for the marker to move
+import mmap
+import os
+
+MAGIC = b"TTT3"
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solved3x3.bin")
+POSITIONS = 3 ** 9
+
+UNSOLVED, LOSS, DRAW, WIN = 0, 1, 2, 3 #result codes, unsolved covers finished and unreachable positions
+RESULTS = {-10: LOSS, 0: DRAW, 10: WIN} #minimax score for the mover -> result code
+
+WEIGHTS = [3 ** cell for cell in range(9)] #cell i counts 1 * 3^i for X and 2 * 3^i for O
+
+
+def position_index(board):
+    #base 3 index of a list of lists board
+    index = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == 'X':
+                index += WEIGHTS[3 * i + j]
+            elif cell == 'O':
+                index += 2 * WEIGHTS[3 * i + j]
+    return index
+
+
+def load(path=TABLE_PATH):
+    #memory maps the table, returns None if it has not been built
+    try:
+        with open(path, "rb") as f:
+            table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if table[:len(MAGIC)] != MAGIC or len(table) != len(MAGIC) + 2 * POSITIONS:
+        table.close()
+        return None
+    return table
+
+
+def probe(table, board, mark):
+    #returns (result, (row, col)) for the marker to move, or None if the position is not in the table
+    entry = table[len(MAGIC) + 2 * position_index(board) + (mark == 'O')]
+    if entry >> 4 == UNSOLVED:
+        return None
+    return entry >> 4, divmod(entry & 15, 3)
+
+
+def build(path=TABLE_PATH):
+    #solves every reachable position with the memoized 3x3 minimax and writes the table
+    from .bitboard import Bitboard
+    from .minimax3 import memo, minimax
+    from .symmetry import canonical, from_canonical
+
+    table = bytearray(2 * POSITIONS)
+    seen = set()
+
+    def visit(board, index, mover):
+        if (index, mover) in seen:
+            return
+        seen.add((index, mover))
+        other = 'O' if mover == 'X' else 'X'
+        if board.is_winner(other) or board.is_full():
+            return
+        value = minimax(board, 0, True, mover, other)
+        canon_x, canon_o, symmetry = canonical(board.x, board.o, 3)
+        best = from_canonical(memo[(canon_x, canon_o, mover)][1], 3, symmetry)
+        table[2 * index + (mover == 'O')] = RESULTS[value] << 4 | best
+        for cell in list(board.empty_cells()):
+            board.place(cell, mover)
+            visit(board, index + WEIGHTS[cell] * (1 if mover == 'X' else 2), other)
+            board.undo(cell, mover)
+
+    #either marker can start a game
+    visit(Bitboard(3), 0, 'X')
+    visit(Bitboard(3), 0, 'O')
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(table)
+    return len(seen)
+
+
+if __name__ == "__main__":
+    print(f"Solved {build()} positions into {TABLE_PATH}")
@@ -0,0 +1,175 @@
+#opt-in search statistics, for tuning MAX_DEPTH and catching regressions
+#a SearchStats attaches itself to a search by wrapping its methods (on the Engine instance, or minimax3's module
+#functions) and detach puts the originals back. The search code itself has no counters in it, so a search
+#with nothing attached runs exactly as fast as before. Parallel workers search in other processes and are not counted
+#
+#    stats = SearchStats()
+#    stats.attach(engine)            # an alphabeta Engine, or attach() for the 3x3 minimax of Scenario3
+#    engine.best_move(board, 'O', 1.0)
+#    stats.detach()
+#    stats.write("stats.json")
+import json
+import time
+
+from .engine import score
+
+
+class SearchStats:
+    def __init__(self):
+        self.attached = [] #functions that undo each attach
+        self.reset()
+
+    def reset(self):
+        self.nodes = {} #ply below the root position -> nodes visited there
+        self.terminal = 0 #nodes where the game was already won or drawn
+        self.leaves = 0 #nodes at the depth limit, scored by the heuristic
+        self.cutoffs = {} #index of the move in the searched order -> cutoffs it caused
+        self.iterations = [] #one per root search: {"depth", "nodes", "seconds", "complete"}
+        self.caches = {} #name -> [probes, hits]
+
+    def count_cache(self, name, probes, hits):
+        tally = self.caches.setdefault(name, [0, 0])
+        tally[0] += probes
+        tally[1] += hits
+
+    def attach(self, engine=None):
+        #engine is an alphabeta Engine, None attaches to minimax3's search (Scenario3 and Scenario3_noTree)
+        if engine is None:
+            self.attach_minimax3()
+        else:
+            self.attach_engine(engine)
+
+    def detach(self):
+        while self.attached:
+            self.attached.pop()()
+
+    def attach_engine(self, engine):
+        stats, nodes = self, self.nodes
+        search, search_root, ordered_moves, record_cutoff = (
+            engine.minimax, engine.search_root, engine.ordered_moves, engine.record_cutoff)
+        orders = {} #depth -> moves in the order the node being searched there tries them
+
+        def minimax(board, depth, is_maximizing, player, opponent, alpha, beta, max_depth, budget=None, last_move=None):
+            nodes[depth + 1] = nodes.get(depth + 1, 0) + 1
+            last_mark = 'X' if board.x >> last_move & 1 else 'O'
+            if board.wins_at(last_move, last_mark) or board.is_full():
+                stats.terminal += 1
+            elif depth >= max_depth:
+                stats.leaves += 1
+            return search(board, depth, is_maximizing, player, opponent, alpha, beta, max_depth, budget, last_move)
+
+        def ordered(board, tt_move, depth, mark):
+            orders[depth] = ordered_moves(board, tt_move, depth, mark)
+            return orders[depth]
+
+        def cutoff(move, depth, remaining, mark):
+            index = orders[depth].index(move)
+            stats.cutoffs[index] = stats.cutoffs.get(index, 0) + 1
+            record_cutoff(move, depth, remaining, mark)
+
+        def root(board, mark, max_depth, root_moves, budget=None):
+            table = engine.transposition_table
+            before, hits, misses = sum(nodes.values()), table.hits, table.misses
+            start = time.perf_counter()
+            complete = False
+            try:
+                scores = search_root(board, mark, max_depth, root_moves, budget)
+                complete = True
+                return scores
+            finally:
+                stats.iterations.append({"depth": max_depth, "nodes": sum(nodes.values()) - before,
+                                         "seconds": time.perf_counter() - start, "complete": complete})
+                stats.count_cache("transposition", table.hits - hits + table.misses - misses, table.hits - hits)
+
+        engine.minimax, engine.ordered_moves, engine.record_cutoff, engine.search_root = minimax, ordered, cutoff, root
+        tablebase = engine.endgame
+        if tablebase is not None:
+            probe = tablebase.probe
+
+            def probe_endgame(x, o, mark):
+                result = probe(x, o, mark)
+                stats.count_cache("endgame", 1, result is not None)
+                return result
+            tablebase.probe = probe_endgame
+
+        def undo():
+            for name in ("minimax", "ordered_moves", "record_cutoff", "search_root"):
+                del engine.__dict__[name]
+            if tablebase is not None:
+                del tablebase.__dict__["probe"]
+        self.attached.append(undo)
+
+    def attach_minimax3(self):
+        #minimax3 has no depth limit or pruning, so every search runs to the end of the game and nothing is cut off
+        from . import gametree, minimax3, solved_table
+        stats, nodes, memo = self, self.nodes, minimax3.memo
+        search, probe = minimax3.minimax, solved_table.probe
+
+        def minimax(board, depth, is_maximizing, player, opponent, last_move=None):
+            nodes[depth] = nodes.get(depth, 0) + 1
+            if score(board, player, opponent, last_move) or board.is_full():
+                stats.terminal += 1
+                return search(board, depth, is_maximizing, player, opponent, last_move)
+            #a memo hit returns without storing anything, a miss stores at least this position
+            before, start = len(memo), time.perf_counter()
+            total = sum(nodes.values())
+            value = search(board, depth, is_maximizing, player, opponent, last_move)
+            hit = len(memo) == before
+            stats.count_cache("memo", 1, hit)
+            if depth == 0 and not hit: #a top level search, not one answered from the memo
+                stats.iterations.append({"depth": len(board.cell_lines) - (board.x | board.o).bit_count(),
+                                         "nodes": sum(nodes.values()) - total + 1,
+                                         "seconds": time.perf_counter() - start, "complete": True})
+            return value
+
+        def probe_solved(table, board, mark):
+            entry = probe(table, board, mark)
+            stats.count_cache("solved", 1, entry is not None)
+            return entry
+
+        minimax3.minimax = gametree.minimax = minimax
+        solved_table.probe = probe_solved
+
+        def undo():
+            minimax3.minimax = gametree.minimax = search
+            solved_table.probe = probe
+        self.attached.append(undo)
+
+    def to_dict(self):
+        total = sum(self.nodes.values())
+        cutoffs = sum(self.cutoffs.values())
+        #effective branching factor: how many times more nodes each depth of the deepening took than the one before
+        complete = [iteration for iteration in self.iterations if iteration["complete"]]
+        iterations = []
+        for i, iteration in enumerate(self.iterations):
+            previous = self.iterations[i - 1] if i else None
+            factor = None
+            if previous is not None and previous["complete"] and previous["nodes"] and previous["depth"] == iteration["depth"] - 1:
+                factor = iteration["nodes"] / previous["nodes"]
+            iterations.append(dict(iteration, branching_factor=factor))
+        factors = [iteration["branching_factor"] for iteration in iterations
+                   if iteration["complete"] and iteration["branching_factor"] is not None]
+        return {
+            "nodes": total,
+            "nodes_per_ply": dict(sorted(self.nodes.items())),
+            "terminal": self.terminal,
+            "leaves": self.leaves,
+            "interior": total - self.terminal - self.leaves,
+            "cutoffs": cutoffs,
+            "cutoffs_by_move_index": dict(sorted(self.cutoffs.items())),
+            "first_move_cutoff_rate": self.cutoffs.get(0, 0) / cutoffs if cutoffs else None,
+            "effective_branching_factor": factors[-1] if factors else None,
+            "seconds": sum(iteration["seconds"] for iteration in self.iterations),
+            "deepest_complete": max((iteration["depth"] for iteration in complete), default=None),
+            "iterations": iterations,
+            "caches": {name: {"probes": probes, "hits": hits, "hit_rate": hits / probes if probes else None}
+                       for name, (probes, hits) in sorted(self.caches.items())},
+        }
+
+    def to_json(self, indent=None):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def write(self, path):
+        with open(path, "w") as f:
+            f.write(self.to_json(indent=2))
+            f.write("\n")
@@ -0,0 +1,73 @@
+#the 8 rotations and reflections of a square board, used to fold equivalent positions together
+
+SYMMETRIES = {} #size -> list of 8 (perm, inverse) pairs, perm[cell] is where that cell ends up
+MASK_TABLES = {} #size -> per symmetry lookup of every mask, only built for small boards
+TABLE_CELLS = 16 #largest board (in cells) that gets full mask lookup tables
+
+
+def symmetries(size):
+    if size not in SYMMETRIES:
+        n = size - 1
+        maps = [
+            lambda r, c: (r, c), #identity
+            lambda r, c: (c, n - r), #rotate 90
+            lambda r, c: (n - r, n - c), #rotate 180
+            lambda r, c: (n - c, r), #rotate 270
+            lambda r, c: (r, n - c), #mirror left-right
+            lambda r, c: (n - r, c), #mirror top-bottom
+            lambda r, c: (c, r), #main diagonal
+            lambda r, c: (n - c, n - r), #anti-diagonal
+        ]
+        pairs = []
+        for f in maps:
+            perm = [0] * (size * size)
+            for cell in range(size * size):
+                r, c = f(*divmod(cell, size))
+                perm[cell] = size * r + c
+            inverse = [0] * (size * size)
+            for cell, image in enumerate(perm):
+                inverse[image] = cell
+            pairs.append((tuple(perm), tuple(inverse)))
+        SYMMETRIES[size] = pairs
+    return SYMMETRIES[size]
+
+
+def transform(mask, perm):
+    #moves every set bit of mask to its image under perm
+    result = 0
+    while mask:
+        low = mask & -mask
+        result |= 1 << perm[low.bit_length() - 1]
+        mask ^= low
+    return result
+
+
+def mask_tables(size):
+    if size not in MASK_TABLES:
+        MASK_TABLES[size] = [[transform(mask, perm) for mask in range(1 << (size * size))]
+                             for perm, _ in symmetries(size)]
+    return MASK_TABLES[size]
+
+
+def canonical(x, o, size):
+    #returns (x, o, k) for the smallest of the 8 equivalent positions, k is the symmetry that gets there
+    best = None
+    if size * size <= TABLE_CELLS:
+        for k, table in enumerate(mask_tables(size)):
+            candidate = (table[x], table[o], k)
+            if best is None or candidate < best:
+                best = candidate
+    else:
+        for k, (perm, _) in enumerate(symmetries(size)):
+            candidate = (transform(x, perm), transform(o, perm), k)
+            if best is None or candidate < best:
+                best = candidate
+    return best
+
+
+def to_canonical(cell, size, k):
+    return symmetries(size)[k][0][cell]
+
+
+def from_canonical(cell, size, k):
+    return symmetries(size)[k][1][cell]
@@ -0,0 +1,51 @@
+#transposition table for the alpha-beta search, keyed by the zobrist hash of the position
+import random
+
+#bound types stored with each value
+EXACT = 0
+LOWER = 1 #the search failed high, the real value is at least this
+UPPER = 2 #the search failed low, the real value is at most this
+
+ENTRY_SIZE = 200 #rough size in bytes of one dict slot with its key and entry tuple
+
+_side_rng = random.Random("side")
+SIDE_KEYS = {(mover, player): _side_rng.getrandbits(64) for mover in 'XO' for player in 'XO'}
+
+
+def position_key(board, mover, player):
+    #the same stones can have different values depending on who moves and whose score it is
+    return board.hash ^ SIDE_KEYS[(mover, player)]
+
+
+class TranspositionTable:
+    def __init__(self, max_mb=64):
+        self.max_entries = max(1, max_mb * 1024 * 1024 // ENTRY_SIZE)
+        self.entries = {} #key -> (depth, value, bound, best_move)
+        self.hits = 0
+        self.misses = 0
+        self.overwrites = 0
+
+    def lookup(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def store(self, key, depth, value, bound, best_move):
+        existing = self.entries.get(key)
+        if existing is not None:
+            #depth preferred, a shallower result never replaces a deeper one
+            if existing[0] > depth:
+                return
+            self.overwrites += 1
+        elif len(self.entries) >= self.max_entries:
+            #table is full so the oldest entry makes room
+            del self.entries[next(iter(self.entries))]
+            self.overwrites += 1
+        self.entries[key] = (depth, value, bound, best_move)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = self.misses = self.overwrites = 0
@@ -0,0 +1,54 @@
+#writes the nodes from GameTree.stream to a file or pipe as they are searched, as JSON Lines or compact binary
+#JSON Lines: one object per node, {"id": 1, "parent": 0, "depth": 1, "move": [0, 0], "score": 0}, the root's move is null
+#binary: MAGIC, one byte for the board width, then RECORD for every node: id, parent (-1 for the root), depth,
+#cell (-1 for the root) and score, little endian, 11 bytes a node
+import json
+import struct
+
+from .gametree import GameTree
+
+MAGIC = b"TTTG"
+RECORD = struct.Struct("<iibbb")
+FORMATS = ("jsonl", "binary")
+
+
+def export(out, board, computer_marker, fmt="jsonl", max_depth=None, pv=False, top_k=None):
+    #writes the tree for the computer to move on a list of lists board, out is a text stream for jsonl and a
+    #binary one for binary. Returns the number of nodes written
+    game_tree = GameTree(board, computer_marker)
+    nodes = game_tree.stream(max_depth, pv, top_k)
+    if fmt == "jsonl":
+        return write_jsonl(out, nodes, game_tree.width)
+    if fmt == "binary":
+        return write_binary(out, nodes, game_tree.width)
+    raise ValueError(f"unknown format {fmt!r}, expected one of {', '.join(FORMATS)}")
+
+
+def write_jsonl(out, nodes, width):
+    count = 0
+    for node, parent, depth, cell, score in nodes:
+        move = list(divmod(cell, width)) if cell >= 0 else None
+        out.write(json.dumps({"id": node, "parent": parent, "depth": depth, "move": move, "score": score}))
+        out.write("\n")
+        count += 1
+    return count
+
+
+def write_binary(out, nodes, width):
+    out.write(MAGIC + bytes([width]))
+    count = 0
+    for record in nodes:
+        out.write(RECORD.pack(*record))
+        count += 1
+    return count
+
+
+def read_binary(f):
+    #yields (id, parent, depth, (row, col) or None, score) from a binary export, one record at a time
+    header = f.read(len(MAGIC) + 1)
+    if header[:len(MAGIC)] != MAGIC:
+        raise ValueError("not a game tree export")
+    width = header[-1]
+    while record := f.read(RECORD.size):
+        node, parent, depth, cell, score = RECORD.unpack(record)
+        yield node, parent, depth, divmod(cell, width) if cell >= 0 else None, score
@@ -0,0 +1,30 @@
+#self-play tournament between the computer players, with no one at the keyboard
+#plays every pair of the given bots against each other and prints the win/draw/loss rates and speed
+#run with: python tournament.py [games] [bot ...]            (bots: random, rules, minimax, alphabeta, mcts)
+import os
+import sys
+import time
+
+from tictactoe.selfplay import play_match
+
+GAMES = 100000 #games per pairing
+BOTS = ["random", "rules", "minimax"]
+SEED = 0
+SHAPE = (3, 3, 3) #width, height, k
+PROCESSES = os.cpu_count()
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else GAMES
+    bots = sys.argv[2:] or BOTS
+    for i, a in enumerate(bots):
+        for b in bots[i:]:
+            start = time.perf_counter()
+            result = play_match(a, b, games, SEED, SHAPE, PROCESSES)
+            elapsed = time.perf_counter() - start
+            print(f"{a:>9} vs {b:<9} win {result['wins'] / games:6.1%} draw {result['draws'] / games:6.1%} "
+                  f"loss {result['losses'] / games:6.1%}  {games / elapsed:8.0f} games/s {result['moves'] / elapsed:9.0f} moves/s")
+
+
+if __name__ == "__main__":
+    main()